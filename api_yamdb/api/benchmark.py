@@ -0,0 +1,614 @@
+import asyncio
+import io
+import json
+import math
+import os
+import re
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from api_yamdb.db.pool import PooledConnectionMixin, close_pool
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+from users.models import User
+
+from . import urls
+from .v1.authentication import access_token_for
+
+ADMIN_USERNAME = 'bench_admin'
+PERCENTILES = (50, 95, 99)
+# Управление транзакциями не считается запросом: на PostgreSQL Django не
+# выполняет BEGIN через курсор, а пишущие сценарии идут в точках
+# сохранения внешней транзакции.
+TRANSACTION_CONTROL = re.compile(
+    r'(BEGIN|SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b')
+# Конфигурации gunicorn (переменные gunicorn.conf.py) для Server;
+# sync 1 — прежний запуск gunicorn без настроек.
+SERVER_CONFIGS = {
+    'sync 1': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_WORKERS': '1'},
+    'sync': {'GUNICORN_WORKER_CLASS': 'sync'},
+    'gthread 1': {
+        'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_WORKERS': '1'},
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread'},
+    'gevent': {'GUNICORN_WORKER_CLASS': 'gevent'},
+}
+# Настройки соединений с БД, которые сравнивает run_connections.
+CONNECTION_MODES = {
+    'close': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'POOL': None},
+    'persistent': {
+        'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': False, 'POOL': None},
+    'health checks': {
+        'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True, 'POOL': None},
+    'pool': {
+        'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+        'POOL': {'SIZE': 1, 'TIMEOUT': 10},
+    },
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    route: str
+    method: str = 'get'
+    kwargs: dict = field(default_factory=dict)
+    query: str = ''
+    data: object = None
+    auth: bool = False
+    status: int = 200
+
+    @property
+    def write(self):
+        return self.method != 'get'
+
+    @property
+    def path(self):
+        path = reverse(self.route, kwargs=self.kwargs)
+        return f'{path}?{self.query}' if self.query else path
+
+
+def route_names(patterns=urls.urlpatterns):
+    """Имена всех маршрутов api/urls.py, включая роутер."""
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def scenarios():
+    """
+    Сценарии по всем маршрутам API на данных текущей БД: самое
+    популярное произведение, его самый обсуждаемый отзыв и т.д.
+    Пишущие сценарии рассчитаны на откат транзакции после запроса.
+    """
+    title = Title.objects.order_by('-rating_count', 'pk').first()
+    if title is None:
+        return []
+    review = (
+        title.reviews.annotate(total=Count('comments'))
+        .order_by('-total', 'pk').first()
+    )
+    comment = review.comments.order_by('pk').first() if review else None
+    category = Category.objects.order_by('pk').first()
+    genre = Genre.objects.order_by('pk').first()
+    user = User.objects.exclude(username=ADMIN_USERNAME).order_by('pk').first()
+    title_kwargs = {'title_id': title.pk}
+    review_kwargs = {'title_id': title.pk, 'review_id': getattr(
+        review, 'pk', 0)}
+    comment_kwargs = {**review_kwargs, 'pk': getattr(comment, 'pk', 0)}
+    word = title.name.split()[0]
+    unreviewed = Title.objects.exclude(
+        reviews__author__username=ADMIN_USERNAME).order_by('pk')[:20]
+    selected = [
+        Scenario('api root', 'api-root'),
+        Scenario('titles', 'title-list'),
+        Scenario('titles by genre', 'title-list',
+                 query=f'genre={getattr(genre, "slug", "")}'),
+        Scenario('titles by name', 'title-list', query=f'name={word}'),
+        Scenario('titles cursor', 'title-list', query='pagination=cursor'),
+        Scenario('titles 100', 'title-list', query='page_size=100'),
+        Scenario('title', 'title-detail', kwargs={'pk': title.pk}),
+        Scenario('top', 'title-top'),
+        Scenario('top by genre', 'title-top',
+                 query=f'genre={getattr(genre, "slug", "")}'),
+        Scenario('trending', 'title-trending'),
+        Scenario('categories', 'category-list'),
+        Scenario('genres', 'genre-list'),
+        Scenario('search', 'search',
+                 query=urllib.parse.urlencode({'q': title.name})),
+        Scenario('users', 'user-list', auth=True),
+        Scenario('user', 'user-detail', auth=True,
+                 kwargs={'username': getattr(user, 'username', '')}),
+        Scenario('me', 'user-me', auth=True),
+        Scenario('cache stats', 'cache', auth=True),
+        Scenario('metrics', 'metrics', auth=True),
+        Scenario('export titles', 'export', kwargs={'kind': 'titles'},
+                 auth=True),
+        Scenario('export reviews csv', 'export', kwargs={'kind': 'reviews'},
+                 query='format=csv', auth=True),
+    ]
+    if review:
+        selected += [
+            Scenario('reviews', 'review-list', kwargs=title_kwargs),
+            Scenario('reviews cursor', 'review-list', kwargs=title_kwargs,
+                     query='pagination=cursor'),
+            Scenario('reviews 100', 'review-list', kwargs=title_kwargs,
+                     query='page_size=100'),
+            Scenario('review', 'review-detail',
+                     kwargs={**title_kwargs, 'pk': review.pk}),
+            Scenario('comments', 'comment-list', kwargs=review_kwargs),
+            Scenario('comments cursor', 'comment-list', kwargs=review_kwargs,
+                     query='pagination=cursor'),
+            Scenario('create review', 'review-list', 'post',
+                     title_kwargs, data={'text': 'bench', 'score': 5},
+                     auth=True, status=201),
+            Scenario('update review', 'review-detail', 'patch',
+                     {**title_kwargs, 'pk': review.pk},
+                     data={'score': 7}, auth=True),
+            Scenario('create comment', 'comment-list', 'post',
+                     review_kwargs, data={'text': 'bench'},
+                     auth=True, status=201),
+        ]
+    if comment:
+        selected += [
+            Scenario('comment', 'comment-detail', kwargs=comment_kwargs),
+            Scenario('delete comment', 'comment-detail', 'delete',
+                     comment_kwargs, auth=True, status=204),
+        ]
+    selected += [
+        Scenario('create title', 'title-list', 'post', data={
+            'name': 'bench', 'year': 2000, 'description': 'bench',
+            'category': getattr(category, 'slug', ''),
+            'genre': [getattr(genre, 'slug', '')],
+        }, auth=True, status=201),
+        Scenario('bulk titles', 'title-bulk', 'post', data=[{
+            'name': f'bench {i}', 'year': 2000, 'description': 'bench',
+            'category': getattr(category, 'slug', ''),
+            'genre': [getattr(genre, 'slug', '')],
+        } for i in range(20)], auth=True, status=201),
+        Scenario('bulk reviews', 'review-bulk', 'post', data=[
+            {'title': pk, 'text': 'bench', 'score': 5}
+            for pk in unreviewed.values_list('pk', flat=True)
+        ], auth=True, status=201),
+        Scenario('update title', 'title-detail', 'patch',
+                 {'pk': title.pk}, data={'year': 2001}, auth=True),
+        Scenario('create category', 'category-list', 'post',
+                 data={'name': 'bench', 'slug': 'bench-new'},
+                 auth=True, status=201),
+        Scenario('delete category', 'category-detail', 'delete',
+                 {'slug': getattr(category, 'slug', '')},
+                 auth=True, status=204),
+        Scenario('create genre', 'genre-list', 'post',
+                 data={'name': 'bench', 'slug': 'bench-new'},
+                 auth=True, status=201),
+        Scenario('delete genre', 'genre-detail', 'delete',
+                 {'slug': getattr(genre, 'slug', '')},
+                 auth=True, status=204),
+        Scenario('create user', 'user-list', 'post', data={
+            'username': 'bench_new', 'email': 'bench_new@example.com'
+        }, auth=True, status=201),
+        Scenario('update me', 'user-me', 'patch',
+                 data={'bio': 'bench'}, auth=True),
+        Scenario('signup', 'signup', 'post', data={
+            'username': 'bench_signup', 'email': 'bench_signup@example.com'
+        }),
+        Scenario('token', 'token', 'post', data={
+            'username': ADMIN_USERNAME, 'confirmation_code': 'wrong'
+        }, status=400),
+    ]
+    return selected
+
+
+def admin_token():
+    admin, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={'email': f'{ADMIN_USERNAME}@example.com', 'role': 'admin'},
+    )
+    return str(access_token_for(admin))
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Result:
+    def __init__(self, scenario, mode=None):
+        self.scenario = scenario
+        # Настройки соединений с БД для run_connections.
+        self.mode = mode
+        self.durations = []
+        self.queries = []
+        self.statuses = Counter()
+        self.elapsed = 0
+
+    def add(self, duration, status, queries=None):
+        self.durations.append(duration)
+        self.statuses[status] += 1
+        if queries is not None:
+            self.queries.append(queries)
+
+    @property
+    def errors(self):
+        return sum(
+            count for status, count in self.statuses.items()
+            if status != self.scenario.status
+        )
+
+    def summary(self):
+        summary = {
+            'name': self.scenario.name,
+            'method': self.scenario.method.upper(),
+            'path': self.scenario.path,
+            'requests': len(self.durations),
+            'errors': self.errors,
+            'throughput': len(self.durations) / max(self.elapsed, 1e-9),
+            'queries': (
+                sum(self.queries) / len(self.queries) if self.queries
+                else None
+            ),
+        }
+        if self.mode is not None:
+            summary['mode'] = self.mode
+        for percent in PERCENTILES:
+            summary[f'p{percent}'] = percentile(self.durations, percent) * 1000
+        return summary
+
+
+def run_on_commit():
+    """
+    Выполняет функции transaction.on_commit текущей транзакции, как её
+    фиксация, хотя транзакция затем откатывается.
+    """
+    while connection.run_on_commit:
+        _, func = connection.run_on_commit.pop(0)
+        func()
+
+
+def timed_request(send, scenario, headers):
+    """
+    Время ответа и число SQL-запросов, включая работу on_commit.
+    Пишущий запрос выполняется во внешней транзакции, которую
+    откатывает вызывающий.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = send(
+            scenario.path, scenario.data, format='json', **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if scenario.write:
+            run_on_commit()
+        duration = time.perf_counter() - started
+    count = sum(
+        not TRANSACTION_CONTROL.match(query['sql'])
+        for query in queries.captured_queries
+    )
+    return duration, response.status_code, count
+
+
+def run_client(selected, requests, warmup=0):
+    """
+    Прогоняет сценарии через тестовый клиент Django в этом процессе и
+    считает SQL-запросы. Читающие запросы идут как на сервере, каждый
+    пишущий откатывается.
+    Троттлинг проверяется, но с лимитами, которых замер не достигнет.
+    """
+    client = APIClient(HTTP_HOST='localhost')
+    token = admin_token()
+    results = []
+    rest_framework = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            scope: '1000000/s'
+            for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        },
+    }
+    with override_settings(REST_FRAMEWORK=rest_framework):
+        for scenario in selected:
+            result = Result(scenario)
+            headers = (
+                {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+                if scenario.auth else {}
+            )
+            send = getattr(client, scenario.method)
+            started = time.perf_counter()
+            for i in range(warmup + requests):
+                if i == warmup:
+                    started = time.perf_counter()
+                if scenario.write:
+                    with transaction.atomic():
+                        measured = timed_request(send, scenario, headers)
+                        transaction.set_rollback(True)
+                else:
+                    measured = timed_request(send, scenario, headers)
+                if i >= warmup:
+                    result.add(*measured)
+            result.elapsed = time.perf_counter() - started
+            results.append(result)
+    return results
+
+
+def time_reads(client, scenario, requests, warmup, headers, mode):
+    """Замер читающего сценария с закрытием соединений, как на сервере."""
+    result = Result(scenario, mode)
+    path = scenario.path
+    started = time.perf_counter()
+    for i in range(warmup + requests):
+        if i == warmup:
+            started = time.perf_counter()
+        request_started = time.perf_counter()
+        close_old_connections()
+        response = client.get(path, **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        close_old_connections()
+        duration = time.perf_counter() - request_started
+        if i >= warmup:
+            result.add(duration, response.status_code)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_connections(selected, requests, warmup=0):
+    """
+    Задержка читающих сценариев при разных настройках соединений с БД
+    (CONNECTION_MODES). Тестовый клиент сам соединения не закрывает,
+    поэтому это делается вокруг каждого запроса. Проверки соединений
+    и пул есть только в бэкенде api_yamdb.db.postgresql, с другими
+    бэкендами эти режимы пропускаются.
+    """
+    client = APIClient(HTTP_HOST='localhost')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {admin_token()}'}
+    pooled = isinstance(connection, PooledConnectionMixin)
+    modes = {
+        mode: options for mode, options in CONNECTION_MODES.items()
+        if pooled or not (options['POOL'] or options['CONN_HEALTH_CHECKS'])
+    }
+    original = {
+        key: connection.settings_dict.get(key)
+        for key in CONNECTION_MODES['close']
+    }
+    results = []
+
+    def reset(options):
+        connection.close()
+        close_pool(connection.alias)
+        connection.settings_dict.update(options)
+
+    try:
+        for mode, options in modes.items():
+            reset(options)
+            results += [
+                time_reads(
+                    client, scenario, requests, warmup,
+                    headers if scenario.auth else {}, mode)
+                for scenario in selected if not scenario.write
+            ]
+    finally:
+        reset(original)
+    return results
+
+
+def run_codecs(selected, requests):
+    """
+    Процессорное время на JSON одного запроса, мкс: рендеринг ответа
+    читающих сценариев и разбор тела пишущих — стандартным json
+    и классами из REST_FRAMEWORK (orjson, если он установлен).
+    """
+    client = APIClient(HTTP_HOST='localhost')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {admin_token()}'}
+    rows = []
+
+    def cpu(function):
+        started = time.process_time()
+        for _ in range(requests):
+            function()
+        return (time.process_time() - started) / requests * 1e6
+
+    for scenario in selected:
+        if scenario.write:
+            if not scenario.data:
+                continue
+            body = json.dumps(scenario.data).encode()
+            stdlib, fast = (
+                cpu(lambda parser=parser: parser.parse(io.BytesIO(body)))
+                for parser in (
+                    JSONParser(), api_settings.DEFAULT_PARSER_CLASSES[0]())
+            )
+        else:
+            data = getattr(client.get(scenario.path, **headers), 'data', None)
+            if data is None:
+                # Потоковая выгрузка не проходит через рендерер.
+                continue
+            body = JSONRenderer().render(data)
+            stdlib, fast = (
+                cpu(lambda renderer=renderer: renderer.render(
+                    data, 'application/json'))
+                for renderer in (
+                    JSONRenderer(), api_settings.DEFAULT_RENDERER_CLASSES[0]())
+            )
+        rows.append({
+            'name': scenario.name,
+            'bytes': len(body),
+            'stdlib_us': stdlib,
+            'fast_us': fast,
+            'saved_us': stdlib - fast,
+        })
+    return rows
+
+
+def run_http(selected, requests, base_url, concurrency=1, warmup=0,
+             timeout=30):
+    """
+    Прогоняет читающие сценарии по HTTP против запущенного сервера
+    (например, gunicorn) в concurrency потоков. Таймаут считается
+    ошибкой со статусом 0.
+    """
+    token = admin_token()
+    results = []
+
+    def fetch(scenario):
+        request = urllib.request.Request(base_url.rstrip('/') + scenario.path)
+        if scenario.auth:
+            request.add_header('Authorization', f'Bearer {token}')
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except OSError:
+            status = 0
+        return time.perf_counter() - started, status
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for scenario in selected:
+            if scenario.write:
+                continue
+            result = Result(scenario)
+            list(pool.map(fetch, [scenario] * warmup))
+            started = time.perf_counter()
+            for duration, status in pool.map(fetch, [scenario] * requests):
+                result.add(duration, status)
+            result.elapsed = time.perf_counter() - started
+            results.append(result)
+    return results
+
+
+class Server:
+    """
+    gunicorn с gunicorn.conf.py и переменными окружения env на свободном
+    порту localhost; адрес — в url. Выход из блока останавливает сервер.
+    """
+
+    def __init__(self, env, timeout=30):
+        self.env = env
+        self.timeout = timeout
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self.url = f'http://127.0.0.1:{port}'
+        self.process = None
+        self.log = tempfile.TemporaryFile()
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [
+                'gunicorn', 'api_yamdb.wsgi:application',
+                '--config', 'gunicorn.conf.py',
+            ],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ, **self.env,
+                'GUNICORN_BIND': self.url.split('//')[1],
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=self.log,
+        )
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                raise RuntimeError(self.log.read().decode())
+            try:
+                with urllib.request.urlopen(
+                        f'{self.url}/api/v1/', timeout=1):
+                    return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError(f'gunicorn did not start in {self.timeout} s')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(self.timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class SlowClients:
+    """
+    Медленные клиенты в отдельном потоке: по частям с паузами шлют
+    запрос, читают ответ и подключаются снова. Пока запрос не дошёл,
+    синхронный воркер ждёт его и не обслуживает других.
+    """
+
+    def __init__(self, base_url, count, delay, path='/api/v1/titles/'):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.request = (
+            f'GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n'
+            'Connection: close\r\n\r\n'
+        ).encode()
+        self.count = count
+        self.delay = delay
+        self.stopped = False
+        self.thread = threading.Thread(
+            target=asyncio.run, args=(self.main(),), daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        if self.count:
+            # Даём клиентам подключиться и занять соединения.
+            time.sleep(self.delay * 2)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped = True
+        self.thread.join()
+
+    async def main(self):
+        await asyncio.gather(*(self.client() for _ in range(self.count)))
+
+    async def client(self):
+        while not self.stopped:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port)
+            except OSError:
+                await asyncio.sleep(self.delay)
+                continue
+            try:
+                for i in range(0, len(self.request), 8):
+                    writer.write(self.request[i:i + 8])
+                    await writer.drain()
+                    await asyncio.sleep(self.delay)
+                while await reader.read(65536):
+                    pass
+            except OSError:
+                pass
+            finally:
+                writer.close()
+
+
+def dump(results, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump([result.summary() for result in results], file, indent=2)
@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+# Что импортирует процесс до первого запроса или команды.
+TARGETS = {
+    'setup': 'import django; django.setup()',
+    'web': (
+        'import api_yamdb.wsgi\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().reverse_dict'
+    ),
+}
+COMMAND_TARGET = (
+    'import django; django.setup()\n'
+    'from django.core.management import get_commands, load_command_class\n'
+    'load_command_class(get_commands()[{name!r}], {name!r})'
+)
+# Обёртка печатает время выполнения кода цели, включая не только импорты.
+TIMER = (
+    'import time\n'
+    'started = time.perf_counter()\n'
+    '{code}\n'
+    'print(time.perf_counter() - started)'
+)
+
+
+@dataclass
+class Module:
+    name: str
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self):
+        return self.name.split('.')[0]
+
+
+def parse(stderr):
+    """Строки вывода python -X importtime."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append(Module(name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run(code):
+    """
+    Выполняет code в новом интерпретаторе с -X importtime; возвращает
+    общее время в секундах и импортированные модули.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', TIMER.format(code=code)],
+        cwd=settings.BASE_DIR,
+        env={
+            'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings',
+            'SETUPTOOLS_USE_DISTUTILS': 'stdlib',
+            **os.environ,
+        },
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        raise RuntimeError('\n'.join(
+            line for line in process.stderr.splitlines()
+            if not line.startswith('import time:')
+        ))
+    return float(process.stdout.splitlines()[-1]), parse(process.stderr)
+
+
+def packages(modules):
+    """Собственное время импорта и число модулей по пакетам верхнего уровня."""
+    totals = defaultdict(lambda: [0, 0])
+    for module in modules:
+        totals[module.package][0] += module.self_us
+        totals[module.package][1] += 1
+    return sorted(
+        ((name, self_us, count) for name, (self_us, count) in totals.items()),
+        key=lambda row: -row[1],
+    )
+
+
+def dump(target, elapsed, modules, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'target': target,
+            'elapsed_ms': elapsed * 1000,
+            'packages': [
+                {'package': name, 'self_ms': self_us / 1000, 'modules': count}
+                for name, self_us, count in packages(modules)
+            ],
+            'modules': [
+                {
+                    'module': module.name,
+                    'self_ms': module.self_us / 1000,
+                    'cumulative_ms': module.cumulative_us / 1000,
+                }
+                for module in modules
+            ],
+        }, file, indent=2)
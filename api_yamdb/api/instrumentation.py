@@ -0,0 +1,245 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы времени ответа, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+current = ContextVar('request_metrics', default=None)
+
+# Списки IN разной длины — один и тот же запрос.
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def statement(sql):
+    """SQL без параметров: значения в нём уже заменены на %s."""
+    return IN_LIST.sub('IN (...)', sql)
+
+
+class RequestMetrics:
+    """Замеры одного запроса: SQL, сериализаторы, представление."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = Counter()
+        self.db_time = 0
+        self.serializer_time = 0
+        self.serializer_depth = 0
+        self.view_started = self.view_finished = None
+        self.finished = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка выполнения SQL для connection.execute_wrapper()."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries[statement(sql)] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def duplicates(self, threshold):
+        """
+        Запросы, выполненные не меньше threshold раз. Django передаёт SQL
+        с %s вместо значений, а списки IN сворачивает statement(),
+        поэтому один запрос с разными параметрами считается вместе.
+        """
+        return {
+            sql: count for sql, count in self.queries.items()
+            if count >= threshold
+        }
+
+    def timings(self):
+        """Длительности этапов в миллисекундах."""
+        view_finished = self.view_finished or self.finished
+        view = (
+            view_finished - self.view_started if self.view_started else 0
+        )
+        render = (
+            self.finished - self.view_finished if self.view_finished else 0
+        )
+        return {
+            'db': self.db_time * 1000,
+            'serializer': self.serializer_time * 1000,
+            'view': view * 1000,
+            'render': render * 1000,
+            'total': (self.finished - self.started) * 1000,
+        }
+
+    def server_timing(self):
+        timings = self.timings()
+        entries = [
+            f'{name};dur={duration:.2f}'
+            for name, duration in timings.items()
+        ]
+        entries[0] += f';desc="{self.query_count} queries"'
+        return ', '.join(entries)
+
+
+class RouteHistogram:
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.totals = Counter()
+        self.duplicated = Counter()
+
+    def add(self, metrics, duplicates):
+        timings = metrics.timings()
+        self.requests += 1
+        self.buckets[bisect_left(BUCKETS, timings['total'])] += 1
+        self.totals.update(timings)
+        self.totals['queries'] += metrics.query_count
+        self.duplicated.update(duplicates.keys())
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'histogram': {
+                f'le_{bound}': count
+                for bound, count in zip(BUCKETS, self.buckets)
+            },
+            'mean': {
+                name: total / self.requests
+                for name, total in sorted(self.totals.items())
+            },
+            'duplicate_queries': dict(self.duplicated.most_common(10)),
+        }
+
+
+class Registry:
+    """Гистограммы по маршрутам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def add(self, route, metrics, duplicates):
+        with self.lock:
+            self.routes.setdefault(route, RouteHistogram()).add(
+                metrics, duplicates)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'buckets_ms': [str(bound) for bound in BUCKETS],
+                'routes': {
+                    route: histogram.as_dict()
+                    for route, histogram in sorted(self.routes.items())
+                },
+            }
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = Registry()
+
+
+class TimedSerializerMixin:
+    """
+    Учитывает время сериализации и валидации в замерах запроса.
+    Вложенные сериализаторы не считаются повторно.
+    """
+
+    def timed(self, method, *args):
+        metrics = current.get()
+        if metrics is None:
+            return method(*args)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+    def to_representation(self, instance):
+        return self.timed(super().to_representation, instance)
+
+    def run_validation(self, *args):
+        return self.timed(super().run_validation, *args)
+
+
+class InstrumentationMiddleware:
+    """
+    Замеряет выборку запросов (INSTRUMENTATION_SAMPLE_RATE): число и время
+    SQL-запросов, время сериализаторов, представления и рендеринга.
+    Результат отдаётся в заголовке Server-Timing, в JSON-строке лога
+    и копится в гистограммах по маршрутам.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        if not rate or rate < random.random():
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        metrics.finished = time.perf_counter()
+        self.record(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Вызывается после представления и до рендеринга ответа DRF.
+        metrics = current.get()
+        if metrics is not None:
+            metrics.view_finished = time.perf_counter()
+        return response
+
+    def record(self, request, response, metrics):
+        match = request.resolver_match
+        route = f'{request.method} {match.view_name if match else None}'
+        duplicates = metrics.duplicates(
+            settings.INSTRUMENTATION_DUPLICATE_THRESHOLD)
+        response['Server-Timing'] = metrics.server_timing()
+        registry.add(route, metrics, duplicates)
+        logger.info(json.dumps({
+            'route': route,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.query_count,
+            **{
+                f'{name}_ms': round(duration, 2)
+                for name, duration in metrics.timings().items()
+            },
+            'duplicate_queries': len(duplicates),
+        }))
+        for sql, count in duplicates.items():
+            logger.warning(json.dumps({
+                'route': route,
+                'duplicate_query': sql,
+                'count': count,
+            }))
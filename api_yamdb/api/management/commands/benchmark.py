@@ -0,0 +1,158 @@
+import fnmatch
+
+from django.core.management.base import BaseCommand, CommandError
+from api import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API route and report latency percentiles, "
+        "throughput and queries per request. Run generatedata first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help="Measured requests per scenario",
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help="Unmeasured requests per scenario before measuring",
+        )
+        parser.add_argument(
+            '--only',
+            help="Run scenarios whose name matches this shell pattern",
+        )
+        parser.add_argument(
+            '--read-only',
+            action='store_true',
+            help="Skip the scenarios that write",
+        )
+        parser.add_argument(
+            '--url',
+            help=(
+                "Base URL of a running server to benchmark over HTTP "
+                "instead of the in-process test client; only reads"
+            ),
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help="Parallel HTTP clients with --url",
+        )
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=0,
+            help=(
+                "Clients that keep connections busy by sending and "
+                "reading slowly during the --url run"
+            ),
+        )
+        parser.add_argument(
+            '--slow-delay',
+            type=float,
+            default=0.5,
+            help="Pause in seconds between the slow clients' packets",
+        )
+        parser.add_argument(
+            '--codecs',
+            action='store_true',
+            help=(
+                "Compare CPU time of the stdlib JSON renderer and parser "
+                "with the configured ones instead of timing requests"
+            ),
+        )
+        parser.add_argument(
+            '--connections',
+            action='store_true',
+            help=(
+                "Compare read latency with a new database connection per "
+                "request, persistent connections, health checks and a pool"
+            ),
+        )
+        parser.add_argument(
+            '--json',
+            help="Also save the results to this JSON file",
+        )
+
+    def handle(self, *args, **options):
+        selected = benchmark.scenarios()
+        if not selected:
+            raise CommandError("No titles to benchmark, run generatedata")
+        uncovered = benchmark.route_names() - {
+            scenario.route for scenario in selected}
+        if uncovered:
+            self.stderr.write(
+                f"Routes without scenarios: {', '.join(sorted(uncovered))}")
+        if options['only']:
+            selected = [
+                scenario for scenario in selected
+                if fnmatch.fnmatch(scenario.name, options['only'])
+            ]
+        if options['read_only']:
+            selected = [
+                scenario for scenario in selected if not scenario.write]
+        if options['codecs']:
+            self.print_codecs(
+                benchmark.run_codecs(selected, options['requests']))
+            return
+        if options['connections']:
+            results = benchmark.run_connections(
+                selected, options['requests'], options['warmup'])
+        elif options['url']:
+            with benchmark.SlowClients(
+                options['url'], options['slow_clients'],
+                options['slow_delay']
+            ):
+                results = benchmark.run_http(
+                    selected, options['requests'], options['url'],
+                    options['concurrency'], options['warmup'])
+        else:
+            results = benchmark.run_client(
+                selected, options['requests'], options['warmup'])
+        self.print_results(results)
+        if options['json']:
+            benchmark.dump(results, options['json'])
+
+    def print_results(self, results):
+        mode = None
+        for index, result in enumerate(results):
+            if index == 0 or result.mode != mode:
+                mode = result.mode
+                if mode is not None:
+                    self.stdout.write(self.style.MIGRATE_HEADING(mode))
+                self.stdout.write(
+                    f"{'scenario':<18}{'method':<8}{'p50 ms':>9}"
+                    f"{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}"
+                    f"{'queries':>9}{'errors':>8}"
+                )
+            summary = result.summary()
+            queries = summary['queries']
+            queries = '-' if queries is None else f'{queries:.1f}'
+            line = (
+                f"{summary['name']:<18}{summary['method']:<8}"
+                f"{summary['p50']:>9.2f}{summary['p95']:>9.2f}"
+                f"{summary['p99']:>9.2f}{summary['throughput']:>9.0f}"
+                f"{queries:>9}{summary['errors']:>8}"
+            )
+            if summary['errors']:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+    def print_codecs(self, rows):
+        self.stdout.write(
+            f"{'scenario':<18}{'bytes':>9}{'json us':>10}"
+            f"{'fast us':>10}{'saved us':>10}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['name']:<18}{row['bytes']:>9}"
+                f"{row['stdlib_us']:>10.1f}{row['fast_us']:>10.1f}"
+                f"{row['saved_us']:>10.1f}"
+            )
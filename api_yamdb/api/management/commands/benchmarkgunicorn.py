@@ -0,0 +1,82 @@
+import fnmatch
+import importlib.util
+
+from django.core.management.base import CommandError
+from api import benchmark
+
+from .benchmark import Command as BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Start gunicorn with each worker configuration from "
+        "gunicorn.conf.py and benchmark the list endpoints over HTTP"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help="Measured requests per scenario and configuration",
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help="Unmeasured requests per scenario before measuring",
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help="Parallel HTTP clients",
+        )
+        parser.add_argument(
+            '--only',
+            help="Run configurations whose name matches this shell pattern",
+        )
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=0,
+            help="Clients that keep connections busy during each run",
+        )
+        parser.add_argument(
+            '--slow-delay',
+            type=float,
+            default=0.5,
+            help="Pause in seconds between the slow clients' packets",
+        )
+        parser.add_argument(
+            '--json',
+            help="Also save the results to this JSON file",
+        )
+
+    def handle(self, *args, **options):
+        selected = [
+            scenario for scenario in benchmark.scenarios()
+            if scenario.route.endswith('-list') and not scenario.write
+        ]
+        if not selected:
+            raise CommandError("No titles to benchmark, run generatedata")
+        results = []
+        for name, env in benchmark.SERVER_CONFIGS.items():
+            if options['only'] and not fnmatch.fnmatch(name, options['only']):
+                continue
+            worker = env['GUNICORN_WORKER_CLASS']
+            if worker == 'gevent' and not importlib.util.find_spec(worker):
+                self.stderr.write(f"Skipping {name}: gevent is not installed")
+                continue
+            with benchmark.Server(env) as server, benchmark.SlowClients(
+                server.url, options['slow_clients'], options['slow_delay']
+            ):
+                for result in benchmark.run_http(
+                    selected, options['requests'], server.url,
+                    options['concurrency'], options['warmup']
+                ):
+                    result.mode = name
+                    results.append(result)
+        self.print_results(results)
+        if options['json']:
+            benchmark.dump(results, options['json'])
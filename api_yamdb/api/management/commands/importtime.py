@@ -0,0 +1,70 @@
+from django.core.management import get_commands
+from django.core.management.base import BaseCommand, CommandError
+from api import importtime
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile imports of a fresh interpreter with python -X importtime "
+        "and report the time per top-level package and the slowest modules"
+    )
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            choices=sorted(importtime.TARGETS),
+            default='web',
+            help=(
+                "setup: django.setup() as in every command; web: the WSGI "
+                "application with the URL resolver as in a worker"
+            ),
+        )
+        parser.add_argument(
+            '--command',
+            help="Profile loading this management command instead",
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help="Packages and modules to show",
+        )
+        parser.add_argument(
+            '--json',
+            help="Also save all modules to this JSON file",
+        )
+
+    def handle(self, *args, **options):
+        if options['command']:
+            if options['command'] not in get_commands():
+                raise CommandError(f"Unknown command: {options['command']}")
+            target = f"command {options['command']}"
+            code = importtime.COMMAND_TARGET.format(name=options['command'])
+        else:
+            target = options['target']
+            code = importtime.TARGETS[target]
+        try:
+            elapsed, modules = importtime.run(code)
+        except RuntimeError as error:
+            raise CommandError(str(error).strip().splitlines()[-1])
+        top = options['top']
+        imports = sum(module.self_us for module in modules) / 1000
+        self.stdout.write(
+            f"{target}: {elapsed * 1000:.0f} ms, {imports:.0f} ms in "
+            f"{len(modules)} imports"
+        )
+        self.stdout.write(f"{'package':<32}{'self ms':>10}{'modules':>9}")
+        for name, self_us, count in importtime.packages(modules)[:top]:
+            self.stdout.write(f"{name:<32}{self_us / 1000:>10.1f}{count:>9}")
+        self.stdout.write(
+            f"\n{'module':<48}{'self ms':>10}{'total ms':>10}")
+        for module in sorted(
+            modules, key=lambda module: -module.cumulative_us
+        )[:top]:
+            self.stdout.write(
+                f"{module.name:<48}{module.self_us / 1000:>10.1f}"
+                f"{module.cumulative_us / 1000:>10.1f}"
+            )
+        if options['json']:
+            importtime.dump(target, elapsed, modules, options['json'])
@@ -2,7 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .v1.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet, signup, token)
+                       ReviewViewSet, SearchView, TitleViewSet, UserViewSet,
+                       cache, export, metrics, reviews_bulk, signup,
+                       token)
 
 v1_router = DefaultRouter()
 v1_router.register('titles', TitleViewSet, basename='title')
@@ -21,6 +23,11 @@ auth_patterns = [
 ]
 
 urlpatterns = [
+    path('v1/cache/', cache, name='cache'),
+    path('v1/metrics/', metrics, name='metrics'),
+    path('v1/search/', SearchView.as_view(), name='search'),
+    path('v1/reviews/bulk/', reviews_bulk, name='review-bulk'),
+    path('v1/export/<slug:kind>/', export, name='export'),
     path('v1/', include(v1_router.urls)),
     path('v1/', include(auth_patterns))
 ]
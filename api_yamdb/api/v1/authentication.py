@@ -0,0 +1,52 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import TOKEN_CLAIMS, ClaimsUser
+
+VERSION_CLAIM = 'ver'
+
+
+def access_token_for(user):
+    """Токен доступа с ролью и флагами пользователя в claims."""
+    token = AccessToken.for_user(user)
+    token['username'] = user.username
+    for name in TOKEN_CLAIMS:
+        token[name] = getattr(user, name)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Собирает пользователя из claims токена вместо запроса к БД.
+    Токен действителен, пока его версия совпадает с версией пользователя
+    из кэша; смена роли или флагов увеличивает версию. Токены без версии
+    проверяются как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            pk = validated_token[api_settings.USER_ID_CLAIM]
+            claims = {
+                name: validated_token[name]
+                for name in ('username', *TOKEN_CLAIMS)
+            }
+        except KeyError:
+            raise AuthenticationFailed(
+                'Токен не содержит данных пользователя.',
+                code='token_not_valid'
+            )
+        version = ClaimsUser.cached_token_version(pk)
+        if version is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found')
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_not_valid')
+        if not claims['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive')
+        return ClaimsUser.from_claims(pk, claims)
@@ -0,0 +1,241 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import (IntegrityError, NotSupportedError, connections, router,
+                       transaction)
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from reviews import leaderboard
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_ratings
+from users.models import User
+
+from .cache import invalidate
+from .permissions import IsAdmin
+from .serializers import ReviewBulkSerializer, TitleBulkSerializer
+
+
+def bulk_insert(model, objs):
+    """
+    bulk_create, который проставляет pk и там, где БД их не возвращает.
+    Без RETURNING pk — последние len(objs) строк таблицы: так верно
+    только в SQLite, которая держит блокировку записи до конца транзакции.
+    В остальных таких БД NotSupportedError до вставки.
+    """
+    connection = connections[router.db_for_write(model)]
+    returns_ids = connection.features.can_return_ids_from_bulk_insert
+    if not returns_ids and connection.vendor != 'sqlite':
+        raise NotSupportedError(
+            f'{connection.vendor} does not return ids from bulk inserts')
+    model.objects.bulk_create(objs)
+    if returns_ids or not objs:
+        return objs
+    pks = list(model.objects.order_by('-pk').values_list(
+        'pk', flat=True)[:len(objs)])
+    for obj, pk in zip(objs, reversed(pks)):
+        obj.pk = pk
+    return objs
+
+
+class BulkCreate:
+    """
+    Массовое создание объектов. Каждый элемент проверяется отдельно,
+    связи и дубликаты — одним запросом на всю порцию, а корректные
+    элементы сохраняются одной транзакцией через bulk_create.
+    Ответ содержит результат каждого элемента в порядке запроса.
+    """
+    serializer_class = None
+    model = None
+
+    def __init__(self, request):
+        self.request = request
+        self.errors = {}
+
+    def items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается непустой список объектов.']}
+            )
+        if len(data) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос.'
+            ]})
+        return data
+
+    def validate(self, data):
+        valid = {}
+        for index, item in enumerate(self.items(data)):
+            serializer = self.serializer_class(
+                data=item, context={'request': self.request})
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                self.errors[index] = serializer.errors
+        return valid
+
+    def reject(self, valid, index, field, message):
+        self.errors[index] = {field: [message]}
+        del valid[index]
+
+    def resolve(self, valid):
+        """Проверяет связи и дубликаты; отбрасывает ошибочные элементы."""
+        return valid
+
+    def build(self, data):
+        """Объект модели из проверенных данных элемента."""
+        return self.model(**data)
+
+    def created(self, objs, valid):
+        """Обновляет то, что при bulk_create не обновляют сигналы."""
+
+    def create(self, valid):
+        """Сохраняет элементы; возвращает словарь индекс — объект."""
+        assert self.model is not None, (
+            f"'{self.__class__.__name__}' should include a `model` attribute."
+        )
+        objs = bulk_insert(
+            self.model, [self.build(data) for data in valid.values()])
+        self.created(objs, valid)
+        return dict(zip(valid, objs))
+
+    def run(self, data):
+        valid = self.resolve(self.validate(data))
+        try:
+            with transaction.atomic():
+                created = self.create(valid) if valid else {}
+        except IntegrityError:
+            return Response(
+                {'detail': 'Данные изменились во время загрузки, '
+                           'повторите запрос.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        except NotSupportedError:
+            return Response(
+                {'detail': 'Массовое создание не поддерживается этой БД.'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        results = [
+            {'status': status.HTTP_201_CREATED, 'id': created[index].pk}
+            if index in created else
+            {'status': status.HTTP_400_BAD_REQUEST,
+             'errors': self.errors[index]}
+            for index in range(len(data))
+        ]
+        return Response(
+            {'created': len(created), 'results': results},
+            status=(
+                status.HTTP_207_MULTI_STATUS if self.errors
+                else status.HTTP_201_CREATED
+            )
+        )
+
+
+class TitleBulkCreate(BulkCreate):
+    serializer_class = TitleBulkSerializer
+    model = Title
+
+    def resolve(self, valid):
+        categories = dict(Category.objects.filter(
+            slug__in={data['category'] for data in valid.values()}
+        ).order_by().values_list('slug', 'pk'))
+        genres = dict(Genre.objects.filter(
+            slug__in={slug for data in valid.values()
+                      for slug in data['genre']}
+        ).order_by().values_list('slug', 'pk'))
+        for index, data in list(valid.items()):
+            if data['category'] not in categories:
+                self.reject(valid, index, 'category',
+                            f'Категории {data["category"]} не существует.')
+                continue
+            missing = [slug for slug in data['genre'] if slug not in genres]
+            if missing:
+                self.reject(valid, index, 'genre',
+                            f'Жанров {", ".join(missing)} не существует.')
+                continue
+            data['category'] = categories[data['category']]
+            data['genre'] = {genres[slug] for slug in data['genre']}
+        return valid
+
+    def build(self, data):
+        return Title(
+            name=data['name'],
+            year=data['year'],
+            description=data['description'],
+            category_id=data['category'],
+        )
+
+    def created(self, titles, valid):
+        GenreTitle.objects.bulk_create([
+            GenreTitle(title=title, genre_id=genre)
+            for title, data in zip(titles, valid.values())
+            for genre in data['genre']
+        ])
+        # bulk_create не отправляет сигналы: места в рейтингах и кэш
+        # обновляются вручную.
+        leaderboard.refresh(
+            Title.objects.filter(pk__in=[title.pk for title in titles]))
+        transaction.on_commit(partial(invalidate, 'titles'))
+
+
+class ReviewBulkCreate(BulkCreate):
+    """
+    Отзывы к разным произведениям. Автор по умолчанию — пользователь
+    запроса; указать другого автора может только администратор.
+    """
+    serializer_class = ReviewBulkSerializer
+    model = Review
+
+    def resolve(self, valid):
+        user = self.request.user
+        is_admin = IsAdmin().has_permission(self.request, None)
+        for index, data in list(valid.items()):
+            author = data.setdefault('author', user.username)
+            if author != user.username and not is_admin:
+                self.reject(valid, index, 'author',
+                            'Указать автора может только администратор.')
+        titles = set(Title.objects.filter(
+            pk__in={data['title'] for data in valid.values()}
+        ).order_by().values_list('pk', flat=True))
+        usernames = {data['author'] for data in valid.values()}
+        if usernames == {user.username}:
+            authors = {user.username: user.pk}
+        else:
+            authors = dict(User.objects.filter(
+                username__in=usernames
+            ).order_by().values_list('username', 'pk'))
+        existing = set(Review.objects.filter(
+            title__in=titles, author__in=authors.values()
+        ).order_by().values_list('title', 'author'))
+        for index, data in list(valid.items()):
+            if data['title'] not in titles:
+                self.reject(valid, index, 'title',
+                            f'Произведения {data["title"]} не существует.')
+            elif data['author'] not in authors:
+                self.reject(valid, index, 'author',
+                            f'Пользователя {data["author"]} не существует.')
+            elif (data['title'], authors[data['author']]) in existing:
+                self.reject(valid, index, 'non_field_errors',
+                            'Автор уже написал отзыв к этому произведению.')
+            else:
+                data['author'] = authors[data['author']]
+                # Повтор пары внутри порции тоже дубликат.
+                existing.add((data['title'], data['author']))
+        return valid
+
+    def build(self, data):
+        return Review(
+            title_id=data['title'],
+            author_id=data['author'],
+            text=data['text'],
+            score=data['score'],
+        )
+
+    def created(self, reviews, valid):
+        # Сигналы не срабатывают: рейтинг затронутых произведений
+        # пересчитывается одним UPDATE, места в рейтингах и кэш
+        # обновляются вручную.
+        title_ids = {data['title'] for data in valid.values()}
+        rebuild_ratings(Title.objects.filter(pk__in=title_ids))
+        leaderboard.update_scores(title_ids)
+        transaction.on_commit(partial(invalidate, 'titles'))
@@ -0,0 +1,96 @@
+from hashlib import md5
+
+from api_yamdb.db.replicas import primary
+from django.conf import settings
+from django.core.cache import caches
+
+cache = caches[settings.API_CACHE]
+
+STATS = ('hits', 'misses')
+
+
+def generation_key(namespace):
+    return f'api:{namespace}:generation'
+
+
+def stats_key(namespace, name):
+    return f'api:{namespace}:{name}'
+
+
+def increment(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate(*namespaces):
+    """Сбрасывает закэшированные ответы, сдвигая поколение пространства."""
+    for namespace in namespaces:
+        increment(generation_key(namespace))
+
+
+def count(namespace, name):
+    increment(stats_key(namespace, name))
+
+
+def response_key(namespace, request):
+    generation = cache.get(generation_key(namespace), 0)
+    path = md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'api:{namespace}:{generation}:{path}'
+
+
+def cache_stats(namespaces):
+    keys = [
+        stats_key(namespace, name)
+        for namespace in namespaces for name in STATS
+    ]
+    values = cache.get_many(keys)
+    stats = {}
+    for namespace in namespaces:
+        hits, misses = (
+            values.get(stats_key(namespace, name), 0) for name in STATS
+        )
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / max(hits + misses, 1), 3),
+        }
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы GET-запросов по полному пути вместе с query string.
+    Ответы сбрасываются сигналами моделей, см. api.v1.signals.
+    """
+    cache_namespace = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # DRF не импортируется вместе с api.v1.signals при django.setup().
+        from rest_framework.response import Response
+
+        key = response_key(self.cache_namespace, request)
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_namespace, 'hits')
+            return Response(data)
+        count(self.cache_namespace, 'misses')
+        # Отстающая реплика закэшировала бы старый ответ после сброса.
+        with primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,43 @@
+from hashlib import md5
+
+from django.views.decorators.http import condition
+
+
+class ConditionalListMixin:
+    """
+    Отвечает 304 на условные GET-запросы к списку, не выполняя выборку.
+    ETag и Last-Modified строятся по полям list_version_fields
+    (версия, время изменения) родительского объекта из ParentMixin.
+    Версию должна сдвигать любая запись, меняющая список, в том числе
+    переименование автора (см. reviews.signals).
+    """
+    list_version_fields = None
+
+    def list_version(self):
+        if not hasattr(self, '_list_version'):
+            self._list_version = tuple(
+                getattr(self.parent, name)
+                for name in self.list_version_fields
+            )
+        return self._list_version
+
+    def list_etag(self, request, *args, **kwargs):
+        version, _ = self.list_version()
+        key = (
+            f'{version}:{request.accepted_media_type}:'
+            f'{request.get_full_path()}'
+        )
+        return md5(key.encode()).hexdigest()
+
+    def list_last_modified(self, request, *args, **kwargs):
+        _, modified = self.list_version()
+        return modified
+
+    def list(self, request, *args, **kwargs):
+        assert self.list_version_fields is not None, (
+            f"'{self.__class__.__name__}' should include a "
+            f"`list_version_fields` attribute."
+        )
+        view = condition(self.list_etag, self.list_last_modified)(
+            super().list)
+        return view(request, *args, **kwargs)
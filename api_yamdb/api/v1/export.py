@@ -0,0 +1,217 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BaseRenderer
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+
+
+def json_line(row):
+    return json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_cell(value):
+    if isinstance(value, (list, tuple)):
+        return ','.join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Echo:
+    """Файловый объект для csv.writer, который возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Выгрузка отдаётся потоком, рендерер нужен только для ошибок.
+        return json_line(data).encode() if data is not None else b''
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        writer = csv.writer(Echo())
+        return (
+            writer.writerow(data.keys())
+            + writer.writerow(csv_cell(value) for value in data.values())
+        ).encode()
+
+
+class Export:
+    """
+    Выгрузка таблицы порциями через серверный курсор. columns — пары
+    (поле выгрузки, поле для values()); строки идут в порядке id.
+    БД (using) задаётся явно: ответ читается после того, как
+    ReplicaMiddleware сбросила выбор реплики.
+    """
+    model = None
+    columns = ()
+    # Поля values(), которые нужны только для prepare().
+    extra = ()
+    incremental = True
+
+    def queryset(self, since, using):
+        queryset = self.model.objects.using(using).order_by('pk').values(
+            *(lookup for _, lookup in self.columns), *self.extra)
+        if since is None or not self.incremental:
+            return queryset
+        return queryset.filter(self.changed_since(since))
+
+    def changed_since(self, since):
+        return Q(modified__gte=since)
+
+    @property
+    def fields(self):
+        return [name for name, _ in self.columns]
+
+    def prepare(self, chunk, using):
+        return [
+            {name: row[lookup] for name, lookup in self.columns}
+            for row in chunk
+        ]
+
+    def chunks(self, since=None, using=DEFAULT_DB_ALIAS):
+        size = settings.EXPORT_CHUNK_SIZE
+        rows = self.queryset(since, using).iterator(chunk_size=size)
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield self.prepare(chunk, using)
+
+
+class CategoryExport(Export):
+    model = Category
+    columns = (('name', 'name'), ('slug', 'slug'))
+    incremental = False
+
+
+class GenreExport(CategoryExport):
+    model = Genre
+
+
+class TitleExport(Export):
+    model = Title
+    columns = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('description', 'description'),
+        ('category', 'category__slug'),
+        ('rating', 'rating'),
+        ('modified', 'modified'),
+    )
+    extra = ('reviews_modified',)
+
+    def changed_since(self, since):
+        # Рейтинг меняется вместе со списком отзывов.
+        return Q(modified__gte=since) | Q(reviews_modified__gte=since)
+
+    @property
+    def fields(self):
+        return super().fields + ['genre']
+
+    def prepare(self, chunk, using):
+        genres = {}
+        for title, slug in GenreTitle.objects.using(using).filter(
+            title__in=[row['id'] for row in chunk], genre__isnull=False
+        ).order_by('genre__slug').values_list('title', 'genre__slug'):
+            genres.setdefault(title, []).append(slug)
+        rows = super().prepare(chunk, using)
+        for row, values in zip(rows, chunk):
+            row['genre'] = genres.get(row['id'], [])
+            if values['reviews_modified']:
+                row['modified'] = max(
+                    row['modified'], values['reviews_modified'])
+        return rows
+
+
+class ReviewExport(Export):
+    model = Review
+    columns = (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+        ('modified', 'modified'),
+    )
+
+
+class CommentExport(Export):
+    model = Comment
+    columns = (
+        ('id', 'id'),
+        ('title', 'review__title'),
+        ('review', 'review'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('modified', 'modified'),
+    )
+
+
+EXPORTS = {
+    'titles': TitleExport(),
+    'reviews': ReviewExport(),
+    'comments': CommentExport(),
+    'genres': GenreExport(),
+    'categories': CategoryExport(),
+}
+
+
+def parse_since(value):
+    """Разбирает updated_since в формате ISO 8601; без зоны — UTC."""
+    if value is None:
+        return None
+    try:
+        # Неэкранированный «+» зоны приходит в query string пробелом.
+        since = parse_datetime(value.replace(' ', '+'))
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValidationError({'updated_since': [
+            'Ожидается дата и время в формате ISO 8601.'
+        ]})
+    if timezone.is_naive(since):
+        return timezone.make_aware(since, timezone.utc)
+    return since
+
+
+def ndjson(export, since, using):
+    for chunk in export.chunks(since, using):
+        yield ''.join(json_line(row) for row in chunk)
+
+
+def csv_rows(export, since, using):
+    writer = csv.writer(Echo())
+    fields = export.fields
+    yield writer.writerow(fields)
+    for chunk in export.chunks(since, using):
+        yield ''.join(
+            writer.writerow(csv_cell(row[name]) for name in fields)
+            for row in chunk
+        )
+
+
+STREAMS = {'ndjson': ndjson, 'csv': csv_rows}
@@ -1,26 +1,57 @@
+import re
+
 import django_filters
+from django.db import connections
 from django_filters import FilterSet
 from reviews.models import Title
 
 
 class TitleFilter(FilterSet):
+    """
+    Фильтр произведений: точное совпадение для category, genre и year,
+    поиск подстроки без учёта регистра для name.
+    Параметр 'substring=true' возвращает поиск подстроки и для остальных
+    полей.
+    """
     category = django_filters.CharFilter(
         field_name='category__slug',
-        lookup_expr='contains'
+        method='filter_match'
     )
     genre = django_filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='contains'
+        method='filter_match'
     )
     name = django_filters.CharFilter(
         field_name='name',
-        lookup_expr='contains'
+        method='filter_name'
     )
     year = django_filters.NumberFilter(
         field_name='year',
-        lookup_expr='contains'
+        method='filter_match'
     )
+    substring = django_filters.BooleanFilter(method='filter_substring')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('category', 'genre', 'name', 'year')
+
+    def filter_match(self, queryset, name, value):
+        if not self.form.cleaned_data.get('substring'):
+            return queryset.filter(**{name: value})
+        queryset = queryset.filter(**{f'{name}__contains': value})
+        if name.startswith('genre__'):
+            return queryset.distinct()
+        return queryset
+
+    def filter_name(self, queryset, name, value):
+        """
+        В PostgreSQL icontains использует GIN-индекс pg_trgm.
+        LIKE в SQLite не различает регистр только у ASCII, поэтому там
+        подстрока ищется регулярным выражением с re.IGNORECASE.
+        """
+        if connections[queryset.db].vendor == 'postgresql':
+            return queryset.filter(**{f'{name}__icontains': value})
+        return queryset.filter(**{f'{name}__iregex': re.escape(value)})
+
+    def filter_substring(self, queryset, name, value):
+        return queryset
@@ -0,0 +1,197 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import CharField, Count, F, IntegerField, Max, Value
+from reviews.models import Comment, Review, Title
+
+CONFIG = 'russian'
+TYPES = ('title', 'review', 'comment')
+
+WORD = re.compile(r'\w+')
+ENDINGS = sorted((
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ой', 'ей',
+    'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ов', 'ев', 'ам', 'ям',
+    'ах', 'ях', 'ом', 'ем', 'ую', 'юю', 'ть', 'ся', 'сь', 'а', 'я', 'о',
+    'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True)
+
+
+def stem(word):
+    """Грубый стемминг: отрезает самое длинное типичное окончание."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD.findall(text.lower())]
+
+
+def postgres_search(query, types, using):
+    """Ранжированный поиск по триггерным tsvector-колонкам PostgreSQL."""
+    query = SearchQuery(query, config=CONFIG)
+    querysets = {
+        'title': Title.objects.annotate(
+            title_ref=F('pk'),
+            review_ref=Value(None, output_field=IntegerField()),
+            snippet=F('name'),
+        ),
+        'review': Review.objects.annotate(
+            title_ref=F('title_id'),
+            review_ref=Value(None, output_field=IntegerField()),
+            snippet=F('text'),
+        ),
+        'comment': Comment.objects.annotate(
+            title_ref=F('review__title_id'),
+            review_ref=F('review_id'),
+            snippet=F('text'),
+        ),
+    }
+    selected = [
+        querysets[name].using(using).filter(search_vector=query).values(
+            'title_ref', 'review_ref', 'snippet',
+            object_type=Value(name, output_field=CharField()),
+            object_id=F('pk'),
+            rank=SearchRank(F('search_vector'), query),
+        ).order_by()
+        for name in types
+    ]
+    results = selected[0].union(*selected[1:], all=True)
+    return results.order_by('-rank', 'object_type', 'object_id')
+
+
+class InvertedIndex:
+    """
+    Инвертированный индекс в памяти процесса для SQLite-окружений.
+    Отслеживает записи через сигналы, а после массовых загрузок и откатов
+    транзакций перестраивается по количеству и максимальному id строк.
+    """
+    # Те же веса, что у SearchRank для классов A, B и D.
+    weights = {
+        'title': (('name', 1.0), ('description', 0.4)),
+        'review': (('text', 0.1),),
+        'comment': (('text', 0.1),),
+    }
+    models = {'title': Title, 'review': Review, 'comment': Comment}
+    names = {model: name for name, model in models.items()}
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.fingerprint = None
+        self.postings = defaultdict(dict)
+        self.documents = {}
+
+    def reset(self):
+        with self.lock:
+            self.fingerprint = None
+            self.postings.clear()
+            self.documents.clear()
+
+    def current_fingerprint(self, using):
+        return tuple(
+            tuple(model.objects.using(using).order_by().aggregate(
+                count=Count('pk'), last=Max('pk')).values())
+            for model in self.models.values()
+        )
+
+    def refresh(self, using):
+        fingerprint = self.current_fingerprint(using)
+        with self.lock:
+            if fingerprint == self.fingerprint:
+                return
+            self.postings.clear()
+            self.documents.clear()
+            for name, model in self.models.items():
+                objects = model.objects.using(using).order_by()
+                if name == 'comment':
+                    objects = objects.select_related('review')
+                for obj in objects.iterator():
+                    self.add(obj)
+            self.fingerprint = fingerprint
+
+    def describe(self, obj):
+        if isinstance(obj, Title):
+            return obj.pk, None, obj.name
+        if isinstance(obj, Review):
+            return obj.title_id, None, obj.text
+        return obj.review.title_id, obj.review_id, obj.text
+
+    def add(self, obj):
+        name = self.names[type(obj)]
+        title_ref, review_ref, snippet = self.describe(obj)
+        key = (name, obj.pk)
+        terms = Counter()
+        for field, weight in self.weights[name]:
+            for term in tokenize(getattr(obj, field) or ''):
+                terms[term] += weight
+        with self.lock:
+            self.discard(key)
+            self.documents[key] = (title_ref, review_ref, snippet, terms)
+            for term, weight in terms.items():
+                self.postings[term][key] = weight
+
+    def discard(self, key):
+        with self.lock:
+            document = self.documents.pop(key, None)
+            if document is None:
+                return
+            for term in document[3]:
+                self.postings[term].pop(key, None)
+
+    def update(self, obj, deleted=False):
+        """
+        Обновляет документ, если индекс уже построен в этом процессе.
+        Вызывается после фиксации транзакции, см. api.v1.signals.
+        """
+        with self.lock:
+            if self.fingerprint is None:
+                return
+            if deleted:
+                self.discard((self.names[type(obj)], obj.pk))
+            else:
+                self.add(obj)
+            self.fingerprint = self.current_fingerprint(obj._state.db)
+
+    def search(self, query, types, using):
+        self.refresh(using)
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self.lock:
+            postings = [self.postings.get(term, {}) for term in terms]
+            total = max(len(self.documents), 1)
+            keys = set.intersection(*(set(docs) for docs in postings))
+            results = []
+            for key in keys:
+                if key[0] not in types:
+                    continue
+                rank = sum(
+                    docs[key] * math.log(1 + total / len(docs))
+                    for docs in postings
+                )
+                title_ref, review_ref, snippet, _ = self.documents[key]
+                results.append({
+                    'object_type': key[0],
+                    'object_id': key[1],
+                    'title_ref': title_ref,
+                    'review_ref': review_ref,
+                    'snippet': snippet,
+                    'rank': rank,
+                })
+        results.sort(key=lambda result: (
+            -result['rank'], result['object_type'], result['object_id']))
+        return results
+
+
+search_index = InvertedIndex()
+
+
+def search(query, types, using='default'):
+    if connections[using].vendor == 'postgresql':
+        return postgres_search(query, types, using)
+    return search_index.search(query, types, using)
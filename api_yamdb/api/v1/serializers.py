@@ -1,9 +1,20 @@
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, Title)
 from users.models import User
 
+from ..instrumentation import TimedSerializerMixin
 
-class ReviewSerializers(serializers.ModelSerializer):
+
+class Serializer(TimedSerializerMixin, serializers.Serializer):
+    pass
+
+
+class ModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    pass
+
+
+class ReviewSerializers(ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True,
         default=serializers.CurrentUserDefault())
@@ -12,20 +23,21 @@ class ReviewSerializers(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        if self.context['request'].method != 'POST':
-            return data
-        title = self.context['view'].kwargs.get('title_id')
-        author = self.context['request'].user
-        if Review.objects.filter(
-                author=author, title=title).exists():
-            raise serializers.ValidationError(
-                'Вы уже написали отзыв к этому произведению.'
-            )
-        return data
 
+class ReviewBulkSerializer(ModelSerializer):
+    """
+    Элемент массовой загрузки отзывов. Произведение и автор
+    проверяются сразу для всей порции, см. api.v1.bulk.
+    """
+    title = serializers.IntegerField()
+    author = serializers.SlugField(required=False)
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'text', 'score')
 
-class CommentSerializers(serializers.ModelSerializer):
+
+class CommentSerializers(ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True,
         default=serializers.CurrentUserDefault()
@@ -36,21 +48,21 @@ class CommentSerializers(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(ModelSerializer):
 
     class Meta:
         model = Category
         exclude = ('id', )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(ModelSerializer):
 
     class Meta:
         model = Genre
         exclude = ('id', )
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
@@ -68,7 +80,15 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+class LeaderboardSerializer(ModelSerializer):
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('score', 'title')
+
+
+class TitleCreateSerializer(ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
@@ -91,7 +111,35 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TitleBulkSerializer(ModelSerializer):
+    """
+    Элемент массовой загрузки произведений. Категория и жанры
+    проверяются сразу для всей порции, см. api.v1.bulk.
+    """
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta:
+        model = Title
+        fields = (
+            'name',
+            'year',
+            'description',
+            'category',
+            'genre',
+        )
+
+
+class SearchResultSerializer(Serializer):
+    type = serializers.CharField(source='object_type')
+    id = serializers.IntegerField(source='object_id')
+    title_id = serializers.IntegerField(source='title_ref')
+    review_id = serializers.IntegerField(source='review_ref', allow_null=True)
+    text = serializers.CharField(source='snippet')
+    rank = serializers.FloatField()
+
+
+class UserSerializer(ModelSerializer):
     """
     Сериалайзер для эндпоинта 'users/me/' для любого авторизов. пользователя.
     [GET] персональные данные пользователя.
@@ -114,7 +162,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class UserAdminSerializer(serializers.ModelSerializer):
+class UserAdminSerializer(ModelSerializer):
     """
     Сериалайзер для эндпоинта 'users/' для пользователя с ролью 'admin'.
     [GET] получение списка пользователей.
@@ -141,7 +189,7 @@ class UserAdminSerializer(serializers.ModelSerializer):
         return data
 
 
-class SignUpSerializer(serializers.ModelSerializer):
+class SignUpSerializer(ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'email')
@@ -154,7 +202,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         return data
 
 
-class GetTokenSerializer(serializers.Serializer):
+class GetTokenSerializer(Serializer):
     username = serializers.SlugField(required=True)
     confirmation_code = serializers.SlugField(required=True)
 
@@ -0,0 +1,51 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+
+from .cache import invalidate
+from .search import search_index
+
+DEPENDENT_CACHES = {
+    Category: ('categories', 'titles'),
+    Genre: ('genres', 'titles'),
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+}
+
+
+def catalog_changed(sender, **kwargs):
+    # Сброс до фиксации позволил бы параллельному запросу закэшировать
+    # прежние данные под новым поколением.
+    transaction.on_commit(partial(invalidate, *DEPENDENT_CACHES[sender]))
+
+
+for model in DEPENDENT_CACHES:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(partial(invalidate, 'titles'))
+
+
+def search_document_saved(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(search_index.update, instance), using=instance._state.db)
+
+
+def search_document_deleted(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(search_index.update, instance, deleted=True),
+        using=instance._state.db)
+
+
+for model in (Title, Review, Comment):
+    post_save.connect(search_document_saved, sender=model)
+    post_delete.connect(search_document_deleted, sender=model)
@@ -0,0 +1,188 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+def refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def wait_time(buckets, levels):
+    """0, если маркер есть во всех корзинах, иначе сколько секунд ждать."""
+    return max((
+        (1 - tokens) / rate
+        for (_, _, rate), tokens in zip(buckets, levels) if tokens < 1
+    ), default=0)
+
+
+class MemoryBuckets:
+    """
+    Маркерные корзины в памяти процесса. Полные корзины выбрасываются,
+    когда ключей становится больше max_keys.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.max_keys = max_keys
+
+    def consume(self, buckets):
+        """
+        Берёт по маркеру из каждой корзины (ключ, ёмкость, маркеров
+        в секунду), только если маркер есть во всех; возвращает 0 или
+        сколько секунд ждать маркера.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if len(self.buckets) >= self.max_keys:
+                self.prune(now)
+            levels = [
+                refill(*self.buckets.get(key, (capacity, now))[:2],
+                       now, capacity, rate)
+                for key, capacity, rate in buckets
+            ]
+            delay = wait_time(buckets, levels)
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                if not delay:
+                    tokens -= 1
+                full = now + (capacity - tokens) / rate
+                self.buckets[key] = (tokens, now, full)
+            return delay
+
+    def prune(self, now):
+        # Наполнившаяся корзина неотличима от новой.
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items()
+            if bucket[2] > now
+        }
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBuckets:
+    """
+    Корзины в общем кэше (memcached, Redis) для нескольких воркеров.
+    Чтение и запись не атомарны, как и у троттлинга DRF.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, buckets):
+        now = time.time()
+        stored = self.cache.get_many([key for key, _, _ in buckets])
+        levels = [
+            refill(*stored.get(key, (capacity, now)), now, capacity, rate)
+            for key, capacity, rate in buckets
+        ]
+        delay = wait_time(buckets, levels)
+        for (key, capacity, rate), tokens in zip(buckets, levels):
+            if not delay:
+                tokens -= 1
+            timeout = max(int((capacity - tokens) / rate) + 1, 1)
+            self.cache.set(key, (tokens, now), timeout)
+        return delay
+
+
+memory_buckets = MemoryBuckets()
+
+
+def buckets():
+    if settings.THROTTLE_CACHE:
+        return CacheBuckets(settings.THROTTLE_CACHE)
+    return memory_buckets
+
+
+class BucketThrottle(SimpleRateThrottle):
+    """
+    Троттлинг маркерной корзиной: rate '5/min' — это пять запросов подряд
+    и затем по одному каждые 12 секунд. Корзина — по IP-адресу клиента.
+    Не обращается к БД.
+    """
+
+    def get_rate(self):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            return super().get_rate()
+
+    def get_keys(self, request):
+        return [self.get_ident(request)]
+
+    def get_buckets(self, request):
+        if self.rate is None:
+            return []
+        rate = self.num_requests / self.duration
+        return [
+            (f'throttle:{self.scope}:{key}', self.num_requests, rate)
+            for key in self.get_keys(request)
+        ]
+
+    def allow_request(self, request, view):
+        self.delay = buckets().consume(self.get_buckets(request))
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class IdentityThrottle(BucketThrottle):
+    """Отдельные корзины для каждого имени пользователя и адреса почты."""
+    fields = ('username', 'email')
+
+    def get_keys(self, request):
+        data = request.data if hasattr(request.data, 'get') else {}
+        return [
+            f'{field}:{str(data[field]).strip().lower()}'
+            for field in self.fields if data.get(field)
+        ]
+
+
+class CombinedThrottle(BaseThrottle):
+    """
+    Корзины нескольких BucketThrottle с их лимитами. Маркер берётся
+    из всех корзин, только если он есть в каждой: запрос, отклонённый
+    по имени пользователя, не расходует лимит IP-адреса, и наоборот.
+    """
+    throttles = ()
+
+    def allow_request(self, request, view):
+        self.delay = buckets().consume([
+            bucket for throttle in self.throttles
+            for bucket in throttle().get_buckets(request)
+        ])
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class SignupIPThrottle(BucketThrottle):
+    scope = 'signup_ip'
+
+
+class SignupIdentityThrottle(IdentityThrottle):
+    scope = 'signup_identity'
+
+
+class SignupThrottle(CombinedThrottle):
+    throttles = (SignupIPThrottle, SignupIdentityThrottle)
+
+
+class TokenIPThrottle(BucketThrottle):
+    scope = 'token_ip'
+
+
+class TokenIdentityThrottle(IdentityThrottle):
+    scope = 'token_identity'
+    fields = ('username',)
+
+
+class TokenThrottle(CombinedThrottle):
+    throttles = (TokenIPThrottle, TokenIdentityThrottle)
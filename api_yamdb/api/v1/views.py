@@ -1,71 +1,129 @@
 import uuid
 
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import action, api_view
-from rest_framework.pagination import PageNumberPagination
+from django.utils import timezone
+from rest_framework import filters, generics, mixins, status, viewsets
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes, renderer_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Genre, LeaderboardEntry, Review, Title
 from users.models import User
+from users.outbox import enqueue
 
 from api_yamdb.settings import ADMIN_EMAIL
 
+from ..instrumentation import registry
+from .authentication import access_token_for
+from .bulk import ReviewBulkCreate, TitleBulkCreate
+from .cache import CachedListMixin, CachedRetrieveMixin, cache_stats
+from .conditional import ConditionalListMixin
+from .export import (EXPORTS, STREAMS, CSVRenderer, NDJSONRenderer,
+                     parse_since)
 from .filters import TitleFilter
+from .pagination import (CursorPaginationMixin, NameCursorPagination,
+                         PageNumberPagination, PubDateCursorPagination)
 from .permissions import IsAdmin, IsAuthorModeratorAdminOrReadOnly, ReadOnly
+from .search import TYPES, search
 from .serializers import (CategorySerializer, CommentSerializers,
                           GenreSerializer, GetTokenSerializer,
-                          ReviewSerializers, SignUpSerializer,
+                          LeaderboardSerializer, ReviewSerializers,
+                          SearchResultSerializer, SignUpSerializer,
                           TitleCreateSerializer, TitleReadSerializer,
                           UserAdminSerializer, UserSerializer)
+from .throttling import SignupThrottle, TokenThrottle
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ParentMixin:
+    """
+    Находит родительский объект из URL один раз за запрос: он нужен
+    для выборки, версии списка, контекста сериализатора и создания.
+    """
+    parent_name = None
+    parent_queryset = None
+    # Поле родительского объекта — именованный аргумент URL.
+    parent_lookups = None
+
+    def get_parent(self):
+        assert self.parent_queryset is not None, (
+            f"'{self.__class__.__name__}' should include a "
+            f"`parent_queryset` attribute."
+        )
+        return get_object_or_404(self.parent_queryset, **{
+            field: self.kwargs[kwarg]
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    @property
+    def parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = self.get_parent()
+        return self._parent
+
+    def get_serializer_context(self):
+        return {
+            **super().get_serializer_context(),
+            self.parent_name: self.parent,
+        }
+
+
+class ReviewViewSet(ParentMixin, ConditionalListMixin, CursorPaginationMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializers
     pagination_class = PageNumberPagination
+    cursor_pagination_class = PubDateCursorPagination
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,
                           IsAuthenticatedOrReadOnly)
+    parent_name = 'title'
+    parent_queryset = Title.objects.only('reviews_version', 'reviews_modified')
+    parent_lookups = {'pk': 'title_id'}
+    list_version_fields = ('reviews_version', 'reviews_modified')
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs['title_id']
-        )
-        return title.reviews.all()
+        return self.parent.reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs['title_id']
-        )
-        serializer.save(author=self.request.user, title=title)
+        # Повторный отзыв отсекает ограничение unique_combination_r,
+        # а не отдельный запрос перед вставкой.
+        try:
+            serializer.save(author=self.request.user, title=self.parent)
+        except IntegrityError:
+            # Review.save() откатывает точку сохранения, и транзакция
+            # пригодна для запроса. Прочие нарушения, например удаление
+            # произведения во время записи, не выдаются за повтор.
+            if not Review.objects.filter(
+                    author=self.request.user, title=self.parent).exists():
+                raise
+            raise ValidationError({'non_field_errors': [
+                'Вы уже написали отзыв к этому произведению.'
+            ]})
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ParentMixin, ConditionalListMixin,
+                     CursorPaginationMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializers
     pagination_class = PageNumberPagination
+    cursor_pagination_class = PubDateCursorPagination
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,
                           IsAuthenticatedOrReadOnly)
+    parent_name = 'review'
+    parent_queryset = Review.objects.only(
+        'title', 'comments_version', 'comments_modified')
+    parent_lookups = {'pk': 'review_id', 'title': 'title_id'}
+    list_version_fields = ('comments_version', 'comments_modified')
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs['review_id'],
-            title=self.kwargs['title_id']
-        )
-        return review.comments.all()
+        return self.parent.comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs['review_id'],
-            title=self.kwargs['title_id']
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.parent)
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -76,7 +134,8 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
     pass
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedListMixin, CreateListDestroyViewSet):
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = PageNumberPagination
@@ -86,7 +145,8 @@ class CategoryViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedListMixin, CreateListDestroyViewSet):
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     pagination_class = PageNumberPagination
@@ -96,18 +156,103 @@ class GenreViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+class TitleViewSet(CachedListMixin, CachedRetrieveMixin,
+                   CursorPaginationMixin, viewsets.ModelViewSet):
+    cache_namespace = 'titles'
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre').order_by('name')
     pagination_class = PageNumberPagination
+    cursor_pagination_class = NameCursorPagination
     permission_classes = (IsAdmin | ReadOnly,)
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
+        if self.action in ('top', 'trending'):
+            return LeaderboardSerializer
         return TitleCreateSerializer
 
+    @action(detail=False, pagination_class=None)
+    def top(self, request):
+        """Лучшие произведения по байесовской средней оценке."""
+        return self.leaderboard(LeaderboardEntry.TOP)
+
+    @action(detail=False, pagination_class=None)
+    def trending(self, request):
+        """Произведения с недавними отзывами выше средней оценки."""
+        return self.leaderboard(LeaderboardEntry.TRENDING)
+
+    def leaderboard(self, board):
+        """
+        Первые ?limit= мест предрассчитанного рейтинга, общего или
+        в рамках ?genre=<slug> либо ?category=<slug>.
+        """
+        entries = LeaderboardEntry.objects.filter(
+            board=board,
+            scope=self.leaderboard_scope(),
+            score__gt=0,
+        ).select_related('title__category').prefetch_related(
+            'title__genre').order_by('-score', 'title_id')
+        serializer = self.get_serializer(
+            entries[:self.leaderboard_limit()], many=True)
+        return Response(serializer.data)
+
+    def leaderboard_scope(self):
+        params = self.request.query_params
+        if 'genre' in params and 'category' in params:
+            raise ValidationError(
+                {'non_field_errors': ['Укажите либо genre, либо category.']})
+        for name, model in (('genre', Genre), ('category', Category)):
+            if name not in params:
+                continue
+            pk = model.objects.filter(slug=params[name]).values_list(
+                'pk', flat=True).first()
+            if pk is None:
+                raise NotFound(f'{params[name]} не найден.')
+            return f'{name}:{pk}'
+        return ''
+
+    def leaderboard_limit(self):
+        limit = self.request.query_params.get(
+            'limit', settings.LEADERBOARD_SIZE)
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= settings.MAX_PAGE_SIZE:
+            raise ValidationError({'limit': [
+                f'Ожидается число от 1 до {settings.MAX_PAGE_SIZE}.'
+            ]})
+        return limit
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        return TitleBulkCreate(request).run(request.data)
+
+
+class SearchView(generics.ListAPIView):
+    """
+    Полнотекстовый поиск по произведениям, отзывам и комментариям.
+    [GET] ?q=<запрос>&type=title,review,comment
+    """
+    serializer_class = SearchResultSerializer
+    pagination_class = PageNumberPagination
+    permission_classes = (ReadOnly,)
+    filter_backends = ()
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': ['Укажите поисковый запрос.']})
+        types = self.request.query_params.get('type')
+        types = types.split(',') if types else TYPES
+        if not set(types) <= set(TYPES):
+            raise ValidationError(
+                {'type': [f'Допустимые типы: {", ".join(TYPES)}.']}
+            )
+        return search(query, types, using=Title.objects.db)
+
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -121,17 +266,22 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer_class=UserSerializer,
             pagination_class=None)
     def me(self, request):
+        # request.user может быть собран из токена и содержать не все поля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         serializer = self.get_serializer(
-            request.user, data=request.data, partial=True)
+            user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
+@authentication_classes([])
+@throttle_classes([SignupThrottle])
+@transaction.atomic
 def signup(request):
     user = User.objects.filter(**request.data)
     if user.exists():
@@ -147,14 +297,15 @@ def signup(request):
 
 
 @api_view(['POST'])
+@authentication_classes([])
+@throttle_classes([TokenThrottle])
 def token(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = get_object_or_404(User, username=serializer.data['username'])
     if serializer.data['confirmation_code'] == user.confirmation_code:
-        refresh = RefreshToken.for_user(user)
         return Response(
-            {'token': str(refresh.access_token)},
+            {'token': str(access_token_for(user))},
             status=status.HTTP_200_OK
         )
     return Response(
@@ -163,12 +314,64 @@ def token(request):
     )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def reviews_bulk(request):
+    return ReviewBulkCreate(request).run(request.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+@renderer_classes([NDJSONRenderer, CSVRenderer])
+def export(request, kind):
+    """
+    Потоковая выгрузка таблицы в NDJSON или CSV (?format=csv).
+    ?updated_since=<дата> отдаёт только изменённые с этого момента строки;
+    для следующей выгрузки подходит заголовок X-Export-Timestamp.
+    Удалённые строки такая выгрузка не показывает.
+    """
+    if kind not in EXPORTS:
+        raise Http404
+    since = parse_since(request.query_params.get('updated_since'))
+    started = timezone.now()
+    renderer = request.accepted_renderer
+    # Строки читаются уже после ответа представления, когда реплика
+    # запроса сброшена, поэтому БД выбирается здесь.
+    using = router.db_for_read(EXPORTS[kind].model)
+    response = StreamingHttpResponse(
+        STREAMS[renderer.format](EXPORTS[kind], since, using),
+        content_type=f'{renderer.media_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{renderer.format}"')
+    response['X-Export-Timestamp'] = started.isoformat()
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache(request):
+    return Response(
+        cache_stats(('categories', 'genres', 'titles')),
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    if request.method == 'DELETE':
+        registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(registry.snapshot(), status=status.HTTP_200_OK)
+
+
 def get_and_send_confirmation_code(user):
     user.update(confirmation_code=str(uuid.uuid4()).split("-")[0])
-    send_mail(
+    enqueue(
         'Код подтверждения',
         (f'Код подтверждения для пользователя "{user[0].username}":'
          f' {user[0].confirmation_code}'),
+        user[0].email,
         ADMIN_EMAIL,
-        [user[0].email]
     )
@@ -1,7 +1,209 @@
+"""
+ASGI-точка входа для uvicorn и gunicorn с воркером
+uvicorn.workers.UvicornWorker.
+
+В Django 2.2 нет асинхронных представлений, поэтому приложение —
+мост к WSGI-обработчику: тело запроса читается и ответ отдаётся клиенту
+в цикле событий, а Django работает в ограниченном пуле потоков. Медленный
+клиент занимает корутину, а не поток. Горячие читающие маршруты
+(произведения, отзывы, комментарии) получают собственный пул, чтобы
+их не задерживали долгие записи и поиск.
+"""
+import asyncio
+import io
 import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+HOT_READS = re.compile(
+    r'^/api/v1/titles/(\d+/)?((reviews/)|(reviews/\d+/comments/))?$')
+# Сколько порций ответа поток может опередить медленного клиента.
+BUFFERED_CHUNKS = 8
+# Как часто поток, ждущий места в очереди, проверяет, не ушёл ли клиент.
+PUT_TIMEOUT = 0.1
+
+
+def pool(name, default):
+    return ThreadPoolExecutor(
+        int(os.getenv(name, default=default)), thread_name_prefix=name)
+
+
+read_pool = pool('ASGI_READ_THREADS', 8)
+default_pool = pool('ASGI_THREADS', 8)
+
+
+def build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    # Тело уже прочитано целиком, в том числе при chunked-передаче.
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+class ClientDisconnectedError(Exception):
+    pass
+
+
+def put(item, loop, queue, disconnected):
+    """Ждёт места в очереди, пока клиент не ушёл."""
+    future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+    while True:
+        try:
+            return future.result(PUT_TIMEOUT)
+        except TimeoutError:
+            if disconnected.is_set():
+                future.cancel()
+                raise ClientDisconnectedError
+
+
+def run_wsgi(environ, loop, queue, disconnected):
+    """
+    Выполняет Django в потоке пула и передаёт ответ в цикл событий.
+    Очередь ограничена, поэтому потоковый ответ ждёт медленного клиента,
+    а обычный (одна порция) освобождает поток сразу.
+    """
+    def send(item):
+        if disconnected.is_set():
+            raise ClientDisconnectedError
+        put(item, loop, queue, disconnected)
+
+    def start_response(status, headers, exc_info=None):
+        send(('start', int(status.split(' ', 1)[0]), headers))
+
+    try:
+        response = wsgi_application(environ, start_response)
+        try:
+            for chunk in response:
+                if chunk:
+                    send(('body', chunk))
+        finally:
+            # Сигнал request_finished закрывает соединения с БД потока.
+            response.close()
+    except ClientDisconnectedError:
+        pass
+    finally:
+        # Отправка ответа могла прерваться: тогда очередь никто не
+        # читает, и конец ответа не ждёт места дольше PUT_TIMEOUT.
+        try:
+            put(('end',), loop, queue, disconnected)
+        except ClientDisconnectedError:
+            pass
+
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+    body = await read_body(receive)
+    if body is None:
+        return
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(BUFFERED_CHUNKS)
+    executor = (
+        read_pool
+        if scope['method'] in ('GET', 'HEAD') and HOT_READS.match(
+            scope['path']) else default_pool
+    )
+    disconnected = threading.Event()
+    watcher = asyncio.ensure_future(watch_disconnect(receive, disconnected))
+    worker = loop.run_in_executor(
+        executor, run_wsgi, build_environ(scope, body), loop, queue,
+        disconnected)
+    try:
+        await send_response(queue, send)
+    finally:
+        watcher.cancel()
+        # Поток не должен остаться ждать очередь, которую больше не читают.
+        disconnected.set()
+        await worker
+
+
+async def watch_disconnect(receive, disconnected):
+    """Останавливает потоковый ответ, если клиент ушёл."""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    disconnected.set()
+
+
+async def send_response(queue, send):
+    started = False
+    while True:
+        item = await queue.get()
+        if item[0] == 'start':
+            started = True
+            await send({
+                'type': 'http.response.start',
+                'status': item[1],
+                'headers': [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in item[2]
+                ],
+            })
+        elif item[0] == 'body':
+            await send({
+                'type': 'http.response.body',
+                'body': item[1],
+                'more_body': True,
+            })
+        else:
+            break
+    if not started:
+        await send({'type': 'http.response.start', 'status': 500,
+                    'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
@@ -0,0 +1,207 @@
+import os
+import threading
+from functools import partial
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Пулы процесса по алиасу БД.
+pools = {}
+pools_lock = threading.Lock()
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Пул соединений одного процесса: не больше size открытых соединений.
+    Свободные выдаются начиная с последнего возвращённого; когда заняты
+    все, acquire ждёт освобождения до timeout секунд.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.idle = []
+        self.opened = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, connect, check=None):
+        """
+        Свободное соединение или новое от connect(). check(connection)
+        проверяет свободное соединение; не прошедшее проверку
+        закрывается и заменяется новым.
+        """
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.idle or self.opened < self.size, self.timeout
+            ):
+                raise PoolTimeoutError(
+                    f'Все {self.size} соединений пула заняты '
+                    f'дольше {self.timeout} с.'
+                )
+            if self.idle:
+                connection = self.idle.pop()
+            else:
+                connection = None
+                self.opened += 1
+        if connection is not None:
+            if check is None or check(connection):
+                return connection
+            # Место в пуле остаётся за новым соединением.
+            close_quietly(connection)
+        try:
+            return connect()
+        except BaseException:
+            self.discard()
+            raise
+
+    def release(self, connection, reusable=True):
+        if not reusable:
+            close_quietly(connection)
+            self.discard()
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self):
+        with self.condition:
+            self.opened -= 1
+            self.condition.notify()
+
+    def close(self):
+        """Закрывает свободные соединения."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.opened -= len(idle)
+            self.condition.notify_all()
+        for connection in idle:
+            close_quietly(connection)
+
+
+def pool_for(alias, options):
+    """
+    Пул алиаса с настройками POOL. После fork (воркеры gunicorn с
+    --preload) процесс заводит свой пул: унаследованные соединения
+    не закрываются, чтобы не оборвать соединения родителя.
+    """
+    with pools_lock:
+        pool = pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            pools[alias] = ConnectionPool(
+                options.get('SIZE', 10), options.get('TIMEOUT', 10))
+        return pools[alias]
+
+
+def close_pool(alias):
+    with pools_lock:
+        pool = pools.pop(alias, None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+class PooledConnectionMixin:
+    """
+    Дополнения к DatabaseWrapper Django 2.2:
+
+    * CONN_HEALTH_CHECKS — переиспользуемое соединение проверяется
+      перед первым запросом обработки HTTP-запроса, как в Django 4.1;
+    * POOL ({'SIZE': ..., 'TIMEOUT': ...}) — закрытое соединение
+      возвращается в пул процесса, а не рвётся. Только с CONN_MAX_AGE
+      0: постоянное соединение потока не возвращается в пул, и потоков
+      с соединениями может стать больше SIZE.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        if self.settings_dict.get('POOL') and self.settings_dict.get(
+                'CONN_MAX_AGE', 0) != 0:
+            raise ImproperlyConfigured(
+                f"Database '{self.alias}' sets both POOL and "
+                f"CONN_MAX_AGE; pooled connections need CONN_MAX_AGE 0.")
+
+    @property
+    def health_check_enabled(self):
+        return bool(self.settings_dict.get('CONN_HEALTH_CHECKS'))
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        return pool_for(self.alias, options) if options else None
+
+    def connection_usable(self, connection):
+        try:
+            connection.cursor().execute('SELECT 1')
+        except self.Database.Error:
+            return False
+        return True
+
+    def connection_reusable(self, connection):
+        """Откатывает незавершённую транзакцию; False — соединение сломано."""
+        try:
+            connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            return pool.acquire(
+                partial(super().get_new_connection, conn_params),
+                self.connection_usable if self.health_check_enabled
+                else None
+            )
+        except PoolTimeoutError as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            super()._close()
+        elif self.in_atomic_block:
+            # Соединение, закрытое внутри atomic, остаётся у обёртки до
+            # следующего connect(), поэтому в пул его отдавать нельзя.
+            try:
+                super()._close()
+            finally:
+                pool.discard()
+        else:
+            pool.release(
+                self.connection, self.connection_reusable(self.connection))
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Вызывается в начале и в конце обработки запроса.
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None or self.health_check_done
+            or not self.health_check_enabled or self.in_atomic_block
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,98 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_PREFIX = 'replica'
+API_PREFIX = '/api/'
+# Как rest_framework.permissions.SAFE_METHODS: модуль загружается
+# в django.setup(), а импорт DRF стоит десятки миллисекунд.
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Алиас реплики, с которой читает текущий запрос; None — основная БД.
+current = ContextVar('db_replica', default=None)
+
+
+def replica_aliases():
+    return [
+        alias for alias in connections.databases
+        if alias.startswith(REPLICA_PREFIX)
+    ]
+
+
+@contextmanager
+def primary():
+    """Чтения внутри блока идут в основную БД."""
+    token = current.set(None)
+    try:
+        yield
+    finally:
+        current.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Чтения запроса, которому ReplicaMiddleware выбрала реплику, идут
+    в неё; запись, миграции и чтения внутри транзакции — в основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = current.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def pin_key(request):
+    """Ключ сессии чтения своих записей — по заголовку Authorization."""
+    header = request.META.get('HTTP_AUTHORIZATION')
+    if not header:
+        return None
+    return f'replicas:pin:{md5(header.encode()).hexdigest()}'
+
+
+class ReplicaMiddleware:
+    """
+    Отправляет чтения GET, HEAD и OPTIONS запросов к API на случайную
+    реплику. После успешного изменяющего запроса клиент с тем же
+    токеном DB_REPLICA_PIN_SECONDS секунд читает из основной БД, чтобы
+    видеть свои записи несмотря на отставание реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        aliases = replica_aliases()
+        if not aliases or not request.path_info.startswith(API_PREFIX):
+            return self.get_response(request)
+        cache = caches[settings.DB_REPLICA_CACHE]
+        key = pin_key(request)
+        safe = request.method in SAFE_METHODS
+        alias = None
+        if safe and not (key and cache.get(key)):
+            alias = random.choice(aliases)
+        token = current.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if not safe and key and response.status_code < 400:
+            cache.set(key, True, settings.DB_REPLICA_PIN_SECONDS)
+        return response
@@ -34,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.InstrumentationMiddleware',
+    'api_yamdb.db.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +66,14 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Соединение живёт DB_CONN_MAX_AGE секунд (0 — новое на каждый запрос);
+# DB_CONN_HEALTH_CHECKS проверяет переиспользуемое соединение перед первым
+# запросом. DB_POOL_SIZE больше 0 включает пул процесса: не больше
+# DB_POOL_SIZE соединений, ожидание свободного — до DB_POOL_TIMEOUT секунд.
+# Пул требует DB_CONN_MAX_AGE=0 (значение по умолчанию с пулом).
+# Проверки и пул работают только с ENGINE=api_yamdb.db.postgresql.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', default=0))
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('ENGINE', default='django.db.backends.postgresql'),
@@ -71,10 +81,60 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv(
+            'DB_CONN_MAX_AGE', default=0 if DB_POOL_SIZE else 60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='false').lower() == 'true',
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        } if DB_POOL_SIZE else None,
     }
 }
 
+# Реплики для чтения: DB_REPLICAS — host[:port] через запятую (для SQLite —
+# пути к файлам), остальные параметры как у основной БД. Чтения запросов
+# GET к API идут на реплики, кроме DB_REPLICA_PIN_SECONDS секунд после
+# изменяющего запроса с тем же токеном. Отметки хранятся в кэше
+# DB_REPLICA_CACHE; с LocMemCache они видны только своему процессу.
+DB_REPLICAS = [
+    replica.strip()
+    for replica in os.getenv('DB_REPLICAS', default='').split(',')
+    if replica.strip()
+]
+for index, replica in enumerate(DB_REPLICAS, 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        **(
+            {'NAME': replica}
+            if DATABASES['default']['ENGINE'].endswith('sqlite3')
+            else {'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = (
+    ['api_yamdb.db.replicas.ReplicaRouter'] if DB_REPLICAS else []
+)
+DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', default=5))
+DB_REPLICA_CACHE = os.getenv('DB_REPLICA_CACHE', default='default')
+
+# Общий для воркеров бэкенд (memcached и т.п.) задаётся через CACHE_BACKEND
+# и CACHE_LOCATION; LocMemCache у каждого процесса свой.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+API_CACHE = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': ('django.contrib.auth.password_validation'
@@ -120,22 +180,98 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
-    'DEFAULT_PAGINATION_CLASS': (
-        'rest_framework.pagination.PageNumberPagination',
-    ),
+    # orjson, если установлен, иначе стандартный json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.v1.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.v1.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    # Маркерные корзины api.v1.throttling для signup и token.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', default='20/hour'),
+        'signup_identity': os.getenv(
+            'THROTTLE_SIGNUP_IDENTITY', default='5/hour'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', default='60/hour'),
+        'token_identity': os.getenv(
+            'THROTTLE_TOKEN_IDENTITY', default='10/hour'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
+# Алиас кэша для общих между воркерами корзин троттлинга;
+# пустое значение — корзины в памяти процесса.
+THROTTLE_CACHE = os.getenv('THROTTLE_CACHE', default='')
+
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', default=100))
+
+# Наибольшее число объектов в запросе массовой загрузки.
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', default=100))
+
+# Рейтинги произведений (reviews.leaderboard): сколько оценок, равных
+# средней по всем отзывам, добавляется к оценкам каждого произведения,
+# за сколько дней отзывы считаются недавними и сколько мест отдавать.
+LEADERBOARD_PRIOR_COUNT = int(
+    os.getenv('LEADERBOARD_PRIOR_COUNT', default=10))
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv('LEADERBOARD_TRENDING_DAYS', default=7))
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', default=10))
+
+# Строк в порции серверного курсора потоковой выгрузки.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш версий токенов (ClaimsJWTAuthentication). С LocMemCache отзыв
+# токена доходит до других процессов за AUTH_TOKEN_VERSION_TIMEOUT секунд.
+AUTH_CACHE = os.getenv('AUTH_CACHE', default='default')
+AUTH_TOKEN_VERSION_TIMEOUT = int(
+    os.getenv('AUTH_TOKEN_VERSION_TIMEOUT', default=60))
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 ADMIN_EMAIL = 'admin@mail.ru'
+
+# Письма уходят через очередь в БД, её разбирает команда sendemails.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8))
+# Пауза перед повтором, с; удваивается с каждой попыткой до максимума.
+EMAIL_OUTBOX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_BACKOFF', default=30))
+EMAIL_OUTBOX_MAX_BACKOFF = int(
+    os.getenv('EMAIL_OUTBOX_MAX_BACKOFF', default=3600))
+
+# Доля замеряемых запросов от 0 до 1; при 0 замеры выключены.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv('INSTRUMENTATION_SAMPLE_RATE', default=0))
+# Сколько раз один SQL должен выполниться за запрос, чтобы считаться N+1.
+INSTRUMENTATION_DUPLICATE_THRESHOLD = int(
+    os.getenv('INSTRUMENTATION_DUPLICATE_THRESHOLD', default=3))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,30 @@
+"""
+Прогрев процесса до первого запроса. С preload_app gunicorn вызывает
+warm_up() в мастере до fork (см. gunicorn.conf.py), и воркеры получают
+импортированные модули и маршруты готовыми.
+"""
+from django.apps import apps
+from django.template.loader import get_template
+from django.urls import get_resolver
+from rest_framework.settings import IMPORT_STRINGS, api_settings
+
+
+def warm_routes():
+    # Обращение к reverse_dict импортирует urls.py с представлениями
+    # и компилирует регулярные выражения всех маршрутов.
+    get_resolver().reverse_dict
+
+
+def warm_classes():
+    # Классы из REST_FRAMEWORK импортируются при первом обращении.
+    for name in IMPORT_STRINGS:
+        getattr(api_settings, name)
+    for model in apps.get_models():
+        model._meta.get_fields()
+    # Шаблон BrowsableAPIRenderer компилируется и кэшируется загрузчиком.
+    get_template('rest_framework/api.html')
+
+
+def warm_up():
+    warm_routes()
+    warm_classes()
@@ -0,0 +1,111 @@
+"""
+Настройки gunicorn из переменных окружения GUNICORN_*. gunicorn читает
+файл gunicorn.conf.py из рабочей директории сам.
+"""
+import os
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default=default))
+
+
+def env_bool(name, default):
+    return os.getenv(name, default=str(default)).lower() in ('1', 'true')
+
+
+def cpu_count():
+    """Число CPU с учётом квоты cgroup v2, выданной контейнеру."""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as file:
+            quota, period = file.read().split()
+    except (OSError, ValueError):
+        quota = 'max'
+    if quota != 'max':
+        return max(int(quota) // int(period), 1)
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+
+# sync — поток на воркер; gthread — GUNICORN_THREADS потоков, медленный
+# запрос не блокирует воркер; gevent требует пакет gevent.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+workers = env_int('GUNICORN_WORKERS', cpu_count() * 2 + 1)
+threads = env_int('GUNICORN_THREADS', 4)
+worker_connections = env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Приложение загружается в мастере до fork: воркеры делят память
+# и стартуют быстрее, но код не перезагружается по HUP.
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Воркер перезапускается после max_requests запросов плюс случайные
+# до max_requests_jitter, чтобы воркеры не перезапускались разом.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Файл пульса воркера в памяти: на overlayfs Docker запись в /tmp
+# может подвисать и воркеры убиваются по таймауту.
+worker_tmp_dir = os.getenv(
+    'GUNICORN_WORKER_TMP_DIR',
+    default='/dev/shm' if os.path.isdir('/dev/shm') else None,
+)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', default=None)
+
+# Маршруты и классы DRF готовятся до первого запроса: с preload_app
+# один раз в мастере, иначе в каждом воркере (api_yamdb.warmup).
+warmup = env_bool('GUNICORN_WARMUP', True)
+
+
+def when_ready(server):
+    if warmup and preload_app:
+        from api_yamdb.warmup import warm_up
+
+        warm_up()
+
+
+def post_worker_init(worker):
+    if warmup and not preload_app:
+        from api_yamdb.warmup import warm_up
+
+        warm_up()
+
+
+def pre_fork(server, worker):
+    # Соединения, открытые при загрузке приложения, не должны
+    # достаться воркерам.
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        make_psycopg_green()
+
+
+def make_psycopg_green():
+    """Ожидание ответа PostgreSQL переключает greenlet, а не блокирует."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    def wait(connection, timeout=None):
+        while True:
+            state = connection.poll()
+            if state == extensions.POLL_OK:
+                return
+            if state == extensions.POLL_READ:
+                wait_read(connection.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(connection.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f'Bad result from poll: {state}')
+
+    extensions.set_wait_callback(wait)
@@ -6,6 +6,9 @@ import sys
 
 def main():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    # django.utils.version импортирует distutils; копия из setuptools
+    # тянет pkg_resources и замедляет каждую команду на ~0,2 с.
+    os.environ.setdefault('SETUPTOOLS_USE_DISTUTILS', 'stdlib')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
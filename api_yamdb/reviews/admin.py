@@ -21,8 +21,9 @@ class GenreAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'year', 'category')
+    list_display = ('pk', 'name', 'year', 'category', 'rating')
     list_editable = ('category',)
+    readonly_fields = ('rating', 'rating_count')
     search_fields = ('name', 'year',)
     empty_value_display = '-пусто-'
 
@@ -0,0 +1,170 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews import leaderboard
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_ratings, touch_comments
+from users.models import User
+
+PREFIX = 'bench'
+BATCH_SIZE = 1000
+CATEGORIES = 20
+GENRES = 50
+# За сколько дней до генерации публикуются отзывы.
+DAYS = 365
+
+
+def popularity(count, total, skew):
+    """
+    Распределяет total объектов по count позициям по закону Ципфа:
+    позиция i получает долю, пропорциональную 1 / (i + 1) ** skew.
+    """
+    weights = [1 / (i + 1) ** skew for i in range(count)]
+    scale = total / sum(weights)
+    shares = [int(weight * scale) for weight in weights]
+    for i in range(total - sum(shares)):
+        shares[i % count] += 1
+    return shares
+
+
+def insert(model, objs, batch_size):
+    """Сохраняет объекты из генератора порциями, каждую в своей транзакции."""
+    inserted = 0
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return inserted
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        inserted += len(batch)
+
+
+def spread_dates(objects, start, rng, batch_size):
+    """
+    Проставляет pub_date порциями по pk: start(obj) — самая ранняя
+    допустимая дата, итог равномерен между ней и текущим временем.
+    bulk_create заменяет даты auto_now_add, поэтому они пишутся после
+    вставки.
+    """
+    now = timezone.now()
+    model = objects.model
+    last = 0
+    while True:
+        batch = list(objects.filter(pk__gt=last).order_by('pk')[:batch_size])
+        if not batch:
+            return
+        for obj in batch:
+            earliest = start(obj)
+            obj.pub_date = earliest + (now - earliest) * rng.random()
+        with transaction.atomic():
+            model.objects.bulk_update(batch, ['pub_date'])
+        last = batch[-1].pk
+
+
+def generate(titles, reviews, comments, skew=1.0, seed=0,
+             batch_size=BATCH_SIZE, report=None, days=DAYS):
+    """
+    Создаёт синтетический набор данных для замеров.
+    Отзывы распределены по произведениям по закону Ципфа с показателем
+    skew, число комментариев к отзыву — экспоненциально со средним
+    comments / reviews. Пользователей столько, сколько отзывов у самого
+    популярного произведения: у каждого отзыва произведения свой автор.
+    Отзывы опубликованы в течение days дней, комментарии — после отзыва.
+    Повторный запуск добавляет новые произведения к уже созданным.
+    """
+    rng = random.Random(seed)
+    report = report or (lambda model, count: None)
+    shares = popularity(titles, reviews, skew) if titles else []
+    rng.shuffle(shares)
+    Category.objects.bulk_create(
+        (
+            Category(name=f'{PREFIX} category {i}', slug=f'{PREFIX}-c{i}')
+            for i in range(CATEGORIES)
+        ),
+        ignore_conflicts=True,
+    )
+    Genre.objects.bulk_create(
+        (
+            Genre(name=f'{PREFIX} genre {i}', slug=f'{PREFIX}-g{i}')
+            for i in range(GENRES)
+        ),
+        ignore_conflicts=True,
+    )
+    existing_users = User.objects.filter(
+        username__startswith=f'{PREFIX}_user_').count()
+    report(User, insert(User, (
+        User(
+            username=f'{PREFIX}_user_{i}',
+            email=f'{PREFIX}_user_{i}@example.com',
+        )
+        for i in range(existing_users, max(shares, default=1))
+    ), batch_size))
+    # SQLite не возвращает id из bulk_create, поэтому перечитываем.
+    categories = list(Category.objects.filter(slug__startswith=f'{PREFIX}-c'))
+    genres = list(Genre.objects.filter(slug__startswith=f'{PREFIX}-g'))
+    users = list(
+        User.objects.filter(username__startswith=f'{PREFIX}_user_')
+        .values_list('pk', flat=True)
+    )
+
+    last_title = Title.objects.aggregate(last=Max('pk'))['last'] or 0
+    report(Title, insert(Title, (
+        Title(
+            name=f'{PREFIX} title {last_title + i}',
+            year=rng.randint(1900, 2020),
+            description=f'{PREFIX} description {i}',
+            category=rng.choice(categories),
+        )
+        for i in range(titles)
+    ), batch_size))
+    new_titles = Title.objects.filter(pk__gt=last_title)
+    title_ids = list(new_titles.order_by('pk').values_list('pk', flat=True))
+    report(GenreTitle, insert(GenreTitle, (
+        GenreTitle(title_id=title_id, genre=genre)
+        for title_id in title_ids
+        for genre in rng.sample(genres, 2)
+    ), batch_size))
+
+    def title_reviews(title_id, share):
+        offset = rng.randrange(len(users))
+        for i in range(share):
+            yield Review(
+                title_id=title_id,
+                author_id=users[(offset + i) % len(users)],
+                text=f'{PREFIX} review {title_id}',
+                score=rng.randint(1, 10),
+            )
+
+    report(Review, insert(Review, (
+        review
+        for title_id, share in zip(title_ids, shares)
+        for review in title_reviews(title_id, share)
+    ), batch_size))
+    new_reviews = Review.objects.filter(title_id__gt=last_title)
+    mean = comments / reviews if reviews else 0
+    review_ids = new_reviews.order_by('pk').values_list('pk', flat=True)
+    report(Comment, insert(Comment, (
+        Comment(
+            review_id=review_id,
+            author_id=rng.choice(users),
+            text=f'{PREFIX} comment {review_id}',
+        )
+        for review_id in review_ids.iterator()
+        for _ in range(round(rng.expovariate(1 / mean)) if mean else 0)
+    ), batch_size))
+    since = timezone.now() - timedelta(days=days)
+    spread_dates(
+        new_reviews.only('pk'), lambda review: since, rng, batch_size)
+    spread_dates(
+        Comment.objects.filter(review__title_id__gt=last_title).select_related(
+            'review').only('pk', 'review__pub_date'),
+        lambda comment: comment.review.pub_date, rng, batch_size)
+    rebuild_ratings(new_titles)
+    touch_comments(new_reviews)
+    leaderboard.refresh()
+    return len(title_ids)
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, Sum, Value, When
+from django.utils import timezone
+
+from .models import (GenreTitle, LeaderboardEntry, LeaderboardPrior, Review,
+                     Title)
+
+# Средняя оценка, пока отзывов нет совсем: середина шкалы 1–10.
+DEFAULT_PRIOR = 5.5
+BATCH_SIZE = 1000
+
+
+def weighted(rating_sum, rating_count, prior):
+    """
+    Байесовская средняя: к оценкам произведения добавляются
+    LEADERBOARD_PRIOR_COUNT оценок, равных средней по всем отзывам.
+    """
+    count = settings.LEADERBOARD_PRIOR_COUNT
+    return (count * prior + rating_sum) / (count + rating_count)
+
+
+def update_prior():
+    """
+    Пересчитывает среднюю оценку по всем отзывам. Она хранится в БД,
+    чтобы веб-процессы и refreshleaderboards считали с одной и той же.
+    """
+    totals = Title.objects.aggregate(
+        rating_sum=Sum('rating_sum'), rating_count=Sum('rating_count'))
+    prior = (
+        totals['rating_sum'] / totals['rating_count']
+        if totals['rating_count'] else DEFAULT_PRIOR
+    )
+    LeaderboardPrior.objects.update_or_create(
+        pk=1, defaults={'value': prior})
+    return prior
+
+
+def prior():
+    value = LeaderboardPrior.objects.filter(pk=1).values_list(
+        'value', flat=True).first()
+    if value is None:
+        return update_prior()
+    return value
+
+
+def recent_totals(title_ids):
+    """Сумма и число оценок за LEADERBOARD_TRENDING_DAYS дней."""
+    since = timezone.now() - timedelta(days=settings.LEADERBOARD_TRENDING_DAYS)
+    return {
+        row['title']: (row['total'], row['count'])
+        for row in Review.objects.filter(
+            title__in=title_ids, pub_date__gte=since
+        ).order_by().values('title').annotate(
+            total=Sum('score'), count=Count('pk'))
+    }
+
+
+def scores(rating_sum, rating_count, recent, mean):
+    """
+    Оценки произведения в рейтингах. Лучшие — по байесовской средней
+    всех отзывов. Набирающие популярность — по числу недавних отзывов,
+    умноженному на превышение их байесовской средней над средней
+    по всем отзывам: недавние отзывы ниже средней дают оценку не больше 0.
+    """
+    recent_sum, recent_count = recent
+    return {
+        LeaderboardEntry.TOP: weighted(rating_sum, rating_count, mean),
+        LeaderboardEntry.TRENDING: recent_count * (
+            weighted(recent_sum, recent_count, mean) - mean
+        ),
+    }
+
+
+def scopes(category_id, genre_ids):
+    result = ['']
+    if category_id is not None:
+        result.append(f'category:{category_id}')
+    result += [f'genre:{genre_id}' for genre_id in genre_ids]
+    return result
+
+
+def refresh(titles=None):
+    """
+    Заново строит записи рейтингов произведений (по умолчанию всех)
+    порциями по BATCH_SIZE. Полный пересчёт обновляет и среднюю оценку.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+        mean = update_prior()
+    else:
+        mean = prior()
+    rows = titles.order_by('pk').values_list(
+        'pk', 'category', 'rating_sum', 'rating_count').iterator()
+    created = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(title__in=titles).delete()
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                return created
+            ids = [row[0] for row in batch]
+            genres = {}
+            for title_id, genre_id in GenreTitle.objects.filter(
+                    title__in=ids, genre__isnull=False
+            ).values_list('title', 'genre'):
+                genres.setdefault(title_id, []).append(genre_id)
+            recent = recent_totals(ids)
+            entries = [
+                LeaderboardEntry(
+                    board=board, scope=scope, title_id=pk, score=score)
+                for pk, category_id, rating_sum, rating_count in batch
+                for board, score in scores(
+                    rating_sum, rating_count, recent.get(pk, (0, 0)), mean
+                ).items()
+                for scope in scopes(category_id, genres.get(pk, ()))
+            ]
+            LeaderboardEntry.objects.bulk_create(entries)
+            created += len(entries)
+
+
+def update_scores(title_ids):
+    """
+    Обновляет оценки произведений после записи отзывов одним UPDATE
+    на рейтинг, не трогая разделы. Произведения без записей строятся
+    заново.
+    """
+    titles = list(
+        Title.objects.filter(pk__in=title_ids).order_by()
+        .values_list('pk', 'rating_sum', 'rating_count')
+    )
+    if not titles:
+        # Произведение удаляется вместе с отзывами и записями.
+        return
+    ids = [pk for pk, _, _ in titles]
+    mean = prior()
+    recent = recent_totals(ids)
+    updates = {}
+    for pk, rating_sum, rating_count in titles:
+        for board, score in scores(
+                rating_sum, rating_count, recent.get(pk, (0, 0)), mean
+        ).items():
+            updates.setdefault(board, []).append(
+                When(title=pk, then=Value(score)))
+    ranked = set(LeaderboardEntry.objects.filter(
+        board=LeaderboardEntry.TOP, scope='', title__in=ids
+    ).values_list('title', flat=True))
+    if ranked:
+        for board, whens in updates.items():
+            LeaderboardEntry.objects.filter(
+                board=board, title__in=ranked
+            ).update(score=Case(*whens, output_field=FloatField()))
+    missing = set(ids) - ranked
+    if missing:
+        refresh(Title.objects.filter(pk__in=missing))
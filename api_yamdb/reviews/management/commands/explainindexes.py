@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from reviews.models import Comment, GenreTitle, Review, Title
+
+INDEXES = (
+    'review_title_pub_date_idx',
+    'comment_review_pub_date_idx',
+    'title_name_id_idx',
+    'genretitle_genre_title_idx',
+)
+
+
+def hot_queries():
+    """Запросы вьюсетов, под которые подобраны составные индексы."""
+    title_id = (
+        Review.objects.order_by().values('title')
+        .annotate(total=Count('pk')).order_by('-total')
+        .values_list('title', flat=True).first()
+    )
+    review_id = (
+        Comment.objects.order_by().values('review')
+        .annotate(total=Count('pk')).order_by('-total')
+        .values_list('review', flat=True).first()
+    )
+    genre_slug = (
+        GenreTitle.objects.order_by().values('genre__slug')
+        .annotate(total=Count('pk')).order_by('-total')
+        .values_list('genre__slug', flat=True).first()
+    )
+    reviews = Review.objects.filter(title_id=title_id)
+    comments = Comment.objects.filter(review_id=review_id)
+    return {
+        'reviews page': reviews.order_by('-pub_date')[:10],
+        'reviews cursor': reviews.order_by('-pub_date', 'id')[:10],
+        'comments page': comments.order_by('-pub_date')[:10],
+        'comments cursor': comments.order_by('-pub_date', 'id')[:10],
+        'titles cursor': Title.objects.order_by('name', 'id')[:10],
+        'titles by genre': (
+            Title.objects.filter(genre__slug=genre_slug).order_by('name')[:10]
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Print query plans of the viewset queries with and without "
+        "the composite indexes. Indexes are dropped inside a transaction "
+        "that is rolled back, so run it against a benchmark database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help="Run EXPLAIN ANALYZE (PostgreSQL only)",
+        )
+
+    def handle(self, *args, **options):
+        if not Review.objects.exists():
+            raise CommandError("No reviews to explain, run generatedata")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+        queries = hot_queries()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in INDEXES:
+                    cursor.execute(
+                        f'DROP INDEX {connection.ops.quote_name(name)}')
+            self.explain("Without composite indexes", queries,
+                         explain_options)
+            transaction.set_rollback(True)
+        self.explain("With composite indexes", queries, explain_options)
+
+    def explain(self, heading, queries, explain_options):
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f'  {name}'))
+            for line in queryset.explain(**explain_options).splitlines():
+                self.stdout.write(f'    {line}')
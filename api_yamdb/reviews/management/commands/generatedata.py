@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews import dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset with Zipf-distributed title "
+        "popularity for benchmarks"
+    )
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=1000,
+            help="Titles to create",
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=20000,
+            help="Reviews to spread over the new titles",
+        )
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=50000,
+            help="Approximate number of comments to spread over the reviews",
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help="Zipf exponent of title popularity, 0 is uniform",
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help="Random seed, the same seed gives the same dataset",
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=dataset.DAYS,
+            help="Reviews are published over this many days before now",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=dataset.BATCH_SIZE,
+            help="Rows per INSERT transaction",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        dataset.generate(
+            options['titles'],
+            options['reviews'],
+            options['comments'],
+            skew=options['skew'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            report=self.report,
+            days=options['days'],
+        )
+        self.stdout.write(
+            f"Dataset generated in {time.monotonic() - started:.2f} s")
+
+    def report(self, model, count):
+        self.stdout.write(f"{model.__name__.ljust(10)} {count:>10}")
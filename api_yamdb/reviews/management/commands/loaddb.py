@@ -1,40 +1,61 @@
 import csv
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+from itertools import islice
 
+import django
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from progress.bar import IncrementalBar
-from reviews.models import Category, Comment, Genre, Genre_title, Review, Title
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_ratings, touch_comments
 from users.models import User
 
+BATCH_SIZE = 1000
+CHUNK_SIZE = 10000
 
-def category_create(row):
-    Category.objects.get_or_create(
+
+class IdMap(dict):
+    """Множества id уже загруженных объектов, читаются из БД по запросу."""
+
+    def __missing__(self, model):
+        self[model] = set(model.objects.values_list('pk', flat=True))
+        return self[model]
+
+
+def category_create(row, ids):
+    return Category(
         id=row[0],
         name=row[1],
         slug=row[2],
     )
 
 
-def genre_create(row):
-    Genre.objects.get_or_create(
+def genre_create(row, ids):
+    return Genre(
         id=row[0],
         name=row[1],
         slug=row[2],
     )
 
 
-def titles_create(row):
-    Title.objects.get_or_create(
+def titles_create(row, ids):
+    category_id = int(row[3]) if row[3] else None
+    if category_id not in ids[Category]:
+        category_id = None
+    return Title(
         id=row[0],
         name=row[1],
         year=row[2],
-        category_id=row[3],
+        category_id=category_id,
     )
 
 
-def users_create(row):
-    User.objects.get_or_create(
+def users_create(row, ids):
+    return User(
         id=row[0],
         username=row[1],
         email=row[2],
@@ -45,11 +66,12 @@ def users_create(row):
     )
 
 
-def review_create(row):
-    title, _ = Title.objects.get_or_create(id=row[1])
-    Review.objects.get_or_create(
+def review_create(row, ids):
+    if int(row[1]) not in ids[Title] or int(row[3]) not in ids[User]:
+        return None
+    return Review(
         id=row[0],
-        title=title,
+        title_id=row[1],
         text=row[2],
         author_id=row[3],
         score=row[4],
@@ -57,52 +79,245 @@ def review_create(row):
     )
 
 
-def comment_create(row):
-    review, _ = Review.objects.get_or_create(id=row[1])
-    Comment.objects.get_or_create(
+def comment_create(row, ids):
+    if int(row[1]) not in ids[Review] or int(row[3]) not in ids[User]:
+        return None
+    return Comment(
         id=row[0],
-        review=review,
+        review_id=row[1],
         text=row[2],
         author_id=row[3],
         pub_date=row[4],
     )
 
 
-def genre_title_create(row):
-    title, _ = Title.objects.get_or_create(id=row[1])
-    genre, _ = Genre.objects.get_or_create(id=row[2])
-    Genre_title.objects.get_or_create(
+def genre_title_create(row, ids):
+    if int(row[1]) not in ids[Title] or int(row[2]) not in ids[Genre]:
+        return None
+    return GenreTitle(
         id=row[0],
-        title=title,
-        genre=genre,
+        title_id=row[1],
+        genre_id=row[2],
     )
 
 
 action = {
-    'category.csv': category_create,
-    'genre.csv': genre_create,
-    'titles.csv': titles_create,
-    'users.csv': users_create,
-    'review.csv': review_create,
-    'comments.csv': comment_create,
-    'genre_title.csv': genre_title_create
+    'category.csv': (Category, category_create),
+    'genre.csv': (Genre, genre_create),
+    'users.csv': (User, users_create),
+    'titles.csv': (Title, titles_create),
+    'genre_title.csv': (GenreTitle, genre_title_create),
+    'review.csv': (Review, review_create),
+    'comments.csv': (Comment, comment_create),
 }
 
+levels = (
+    ('category.csv', 'genre.csv', 'users.csv'),
+    ('titles.csv',),
+    ('genre_title.csv', 'review.csv'),
+    ('comments.csv',),
+)
+
+ids = IdMap()
+
+
+def read_chunks(path, chunk_size):
+    """Построчно читает CSV и отдаёт строки порциями по chunk_size."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        next(reader)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield rows
+
+
+def load_rows(filename, rows, batch_size=BATCH_SIZE):
+    """Сохраняет порцию строк файла.
+    Возвращает число переданных в INSERT и пропущенных строк. Строки,
+    которые уже есть в таблице, ignore_conflicts отбрасывает молча:
+    сколько строк добавлено, видно только по размеру таблицы.
+    """
+    model, create = action[filename]
+    objs = [create(row, ids) for row in rows]
+    objs = [obj for obj in objs if obj is not None]
+    # bulk_create заменяет даты auto_now_add текущим временем, поэтому
+    # даты из CSV записываются после вставки.
+    dated = [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    dates = [[getattr(obj, name) for name in dated] for obj in objs]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            objs, batch_size=batch_size, ignore_conflicts=True)
+        if dated and objs:
+            for obj, values in zip(objs, dates):
+                for name, value in zip(dated, values):
+                    setattr(obj, name, value)
+            model.objects.bulk_update(objs, dated, batch_size=batch_size)
+    return len(objs), len(rows) - len(objs)
+
+
+def init_worker():
+    django.setup()
+
+
+def reset_sequences(model):
+    """Сдвигает автоинкремент PK за максимальный загруженный id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def finish_file(model):
+    reset_sequences(model)
+    if model is Review:
+        rebuild_ratings()
+    if model is Comment:
+        touch_comments(Review.objects.all())
+    ids.pop(model, None)
+
+
+def progress_counter(filename):
+    # Импорт откладывается до загрузки: модуль команды импортируется
+    # и для --help.
+    from progress.counter import Counter
+
+    return Counter(f'{filename.ljust(17)} ')
+
+
+def table_size(filename):
+    return action[filename][0].objects.count()
+
+
+class FileStats:
+    def __init__(self, rows_before):
+        self.processed = self.skipped = self.inserted = 0
+        self.rows_before = rows_before
+        self.started = time.monotonic()
+        self.finished = self.started
+
+    def add(self, processed, skipped):
+        self.processed += processed
+        self.skipped += skipped
+        self.finished = time.monotonic()
+
+    def count_inserted(self, rows_after):
+        self.inserted = rows_after - self.rows_before
+
+    @property
+    def rate(self):
+        return self.processed / max(self.finished - self.started, 1e-6)
+
 
 class Command(BaseCommand):
     help = "Load test DB from dir (../static/data/)"
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static/data/'),
+            help="Directory with the CSV files",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows per INSERT statement",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Processes loading the files of one dependency level",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows of one file handed to a worker at a time",
+        )
 
     def handle(self, *args, **options):
-        for filename, row in action.items():
-            path = os.path.join(settings.BASE_DIR, "static/data/") + filename
-            with open(path, 'r', encoding='utf-8') as file:
-                row_count = sum(1 for row in file)
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                bar = IncrementalBar(filename.ljust(17), max=row_count)
-                next(reader)
-                for row in reader:
-                    bar.next()
-                    action[filename](row)
-                bar.finish()
+        stats = {}
+        for level in levels:
+            if options['workers'] > 1:
+                self.load_parallel(level, stats, options)
+            else:
+                self.load_sequential(level, stats, options)
+        for filename, file_stats in stats.items():
+            self.stdout.write(
+                f"{filename.ljust(17)} {file_stats.processed:>10} processed "
+                f"{file_stats.finished - file_stats.started:>9.2f} s "
+                f"{file_stats.rate:>10.0f} rows/s, "
+                f"{file_stats.inserted} inserted, "
+                f"{file_stats.processed - file_stats.inserted} already "
+                f"present, {file_stats.skipped} skipped: missing related "
+                f"objects"
+            )
         self.stdout.write("!!!The database has been loaded successfully!!!")
+
+    def paths(self, level, options):
+        for filename in level:
+            yield filename, os.path.join(options['path'], filename)
+
+    def load_sequential(self, level, stats, options):
+        for filename, path in self.paths(level, options):
+            file_stats = stats[filename] = FileStats(table_size(filename))
+            counter = progress_counter(filename)
+            with transaction.atomic():
+                for rows in read_chunks(path, options['batch_size']):
+                    file_stats.add(*load_rows(filename, rows))
+                    counter.next(len(rows))
+                finish_file(action[filename][0])
+            file_stats.add(0, 0)
+            file_stats.count_inserted(table_size(filename))
+            counter.finish()
+
+    def load_parallel(self, level, stats, options):
+        """
+        Файлы уровня и их порции грузятся параллельно.
+        У каждого процесса своё соединение с БД, каждая порция сохраняется
+        в отдельной транзакции.
+        """
+        # multiprocessing нужен только параллельной загрузке.
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Размеры таблиц — до закрытия соединений: дочерние процессы
+        # не должны наследовать открытое соединение.
+        sizes = {filename: table_size(filename) for filename in level}
+        connections.close_all()
+        pending = set()
+        with ProcessPoolExecutor(
+            options['workers'], initializer=init_worker
+        ) as pool:
+            for filename, path in self.paths(level, options):
+                file_stats = stats[filename] = FileStats(sizes[filename])
+                counter = progress_counter(filename)
+                for rows in read_chunks(path, options['chunk_size']):
+                    if len(pending) >= options['workers'] * 2:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    future = pool.submit(
+                        load_rows, filename, rows, options['batch_size'])
+                    future.add_done_callback(
+                        partial(self.chunk_loaded, file_stats))
+                    pending.add(future)
+                    counter.next(len(rows))
+                counter.finish()
+            for future in pending:
+                future.result()
+        for filename in level:
+            with transaction.atomic():
+                finish_file(action[filename][0])
+            stats[filename].count_inserted(table_size(filename))
+
+    def chunk_loaded(self, file_stats, future):
+        if future.exception() is None:
+            file_stats.add(*future.result())
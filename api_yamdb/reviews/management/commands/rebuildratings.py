@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.rating import broken_ratings, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Rebuild stored title ratings from reviews or check them"
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report titles whose stored rating is out of date",
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            count = rebuild_ratings()
+            self.stdout.write(f"Rebuilt ratings of {count} titles")
+            return
+        broken = broken_ratings()
+        for title in broken:
+            self.stdout.write(
+                f'{title.pk} "{title}": '
+                f'stored {title.rating_sum}/{title.rating_count} '
+                f'= {title.rating}, actual {title.actual_sum}/'
+                f'{title.actual_count} = {title.actual_rating}'
+            )
+        count = broken.count()
+        if count:
+            raise CommandError(f"{count} title ratings are out of date")
+        self.stdout.write("All title ratings are up to date")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from reviews.leaderboard import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the top and trending title leaderboards; run it "
+        "periodically so that trending scores follow the review window"
+    )
+    requires_system_checks = False
+
+    def handle(self, *args, **options):
+        count = refresh()
+        self.stdout.write(f"Rebuilt {count} leaderboard entries")
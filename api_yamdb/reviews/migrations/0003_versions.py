@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_modified',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Комментарии изменены'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comments_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия комментариев'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_modified',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Отзывы изменены'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия отзывов'),
+        ),
+    ]
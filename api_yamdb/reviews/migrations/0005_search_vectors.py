@@ -0,0 +1,81 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+CONFIG = 'pg_catalog.russian'
+
+TITLE_VECTOR = (
+    f"setweight(to_tsvector('{CONFIG}', coalesce({{row}}name, '')), 'A') || "
+    f"setweight(to_tsvector('{CONFIG}', coalesce({{row}}description, '')), "
+    "'B')"
+)
+TEXT_VECTOR = f"to_tsvector('{CONFIG}', coalesce({{row}}text, ''))"
+
+SEARCH_TABLES = (
+    ('reviews_title', TITLE_VECTOR, 'name, description'),
+    ('reviews_review', TEXT_VECTOR, 'text'),
+    ('reviews_comment', TEXT_VECTOR, 'text'),
+)
+
+
+def create_triggers(apps, schema_editor):
+    """
+    search_vector пересчитывается триггером при любой записи, в том числе
+    через bulk_create и loaddb. В SQLite поиск идёт по индексу в памяти.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, vector, columns in SEARCH_TABLES:
+        schema_editor.execute(
+            f'CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$ '
+            f'BEGIN NEW.search_vector := {vector.format(row="NEW.")}; '
+            'RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_search_vector '
+            f'BEFORE INSERT OR UPDATE OF {columns} ON {table} '
+            f'FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector()'
+        )
+        schema_editor.execute(
+            f'UPDATE {table} SET search_vector = {vector.format(row="")}'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_idx ON {table} '
+            'USING gin (search_vector)'
+        )
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, _, _ in SEARCH_TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_idx')
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS {table}_search_vector ON {table}')
+        schema_editor.execute(
+            f'DROP FUNCTION IF EXISTS {table}_search_vector()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
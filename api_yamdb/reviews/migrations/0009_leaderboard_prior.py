@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardPrior',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.FloatField(verbose_name='Средняя оценка')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Пересчитана')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка рейтингов',
+                'verbose_name_plural': 'Средние оценки рейтингов',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 User = get_user_model()
@@ -49,7 +50,7 @@ class Title(models.Model):
     description = models.TextField('Описание')
     genre = models.ManyToManyField(
         Genre,
-        through='Genre_title',
+        through='GenreTitle',
         verbose_name='Жанр'
     )
     category = models.ForeignKey(
@@ -60,15 +61,65 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    reviews_version = models.PositiveIntegerField(
+        'Версия отзывов',
+        default=0,
+        editable=False
+    )
+    reviews_modified = models.DateTimeField(
+        'Отзывы изменены',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    modified = models.DateTimeField('Изменено', auto_now=True, db_index=True)
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ['name']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Поиск по name ускоряет GIN-индекс pg_trgm, он создаётся
+        # миграцией 0004 только в PostgreSQL. search_vector заполняют
+        # триггеры PostgreSQL из миграции 0005.
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_category()
+        return instance
+
+    def remember_category(self):
+        """Запоминает сохранённую в БД категорию произведения."""
+        self._loaded_category = (self.__dict__.get('category_id'),)
+
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
@@ -97,6 +148,12 @@ class GenreTitle(models.Model):
                 name='unique_combination_gt'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genretitle_genre_title_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title} - {self.genre}'
@@ -121,6 +178,23 @@ class Review(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(10)]
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    comments_version = models.PositiveIntegerField(
+        'Версия комментариев',
+        default=0,
+        editable=False
+    )
+    comments_modified = models.DateTimeField(
+        'Комментарии изменены',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    modified = models.DateTimeField('Изменено', auto_now=True, db_index=True)
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
@@ -132,10 +206,32 @@ class Review(models.Model):
                 name='unique_combination_r'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return (self.text)[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating()
+        return instance
+
+    def remember_rating(self):
+        """Запоминает сохранённые в БД произведение и оценку отзыва."""
+        self._loaded_rating = (
+            self.__dict__.get('title_id'), self.__dict__.get('score')
+        )
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -152,11 +248,85 @@ class Comment(models.Model):
         verbose_name='Автор'
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    modified = models.DateTimeField('Изменено', auto_now=True, db_index=True)
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Комментрий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return (self.text)[:15]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Место произведения в предрассчитанном рейтинге: общем (scope '')
+    или в рамках жанра ('genre:<id>') и категории ('category:<id>').
+    Записи ведёт модуль reviews.leaderboard.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+    BOARDS = [
+        (TOP, 'Лучшие'),
+        (TRENDING, 'Набирающие популярность'),
+    ]
+    board = models.CharField('Рейтинг', max_length=16, choices=BOARDS)
+    scope = models.CharField('Раздел', max_length=32, blank=True)
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'scope', 'title'],
+                name='unique_leaderboard_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['board', 'scope', '-score', 'title'],
+                name='leaderboard_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.board} {self.scope}: {self.title_id} {self.score:.2f}'
+
+
+class LeaderboardPrior(models.Model):
+    """
+    Средняя оценка по всем отзывам, с которой считаются байесовские
+    рейтинги. Одна запись, её пересчитывает полное построение рейтингов.
+    """
+    value = models.FloatField('Средняя оценка')
+    updated = models.DateTimeField('Пересчитана', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Средняя оценка рейтингов'
+        verbose_name_plural = 'Средние оценки рейтингов'
+
+    def __str__(self):
+        return f'{self.value:.2f}'
@@ -0,0 +1,100 @@
+from django.db.models import (Count, F, IntegerField, OuterRef, Q, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Review, Title
+
+
+def average(rating_sum, rating_count):
+    """Целочисленный рейтинг; NULL, пока у произведения нет оценок."""
+    return rating_sum / NullIf(rating_count, 0)
+
+
+def update_rating(title_id, delta_sum, delta_count):
+    """
+    Сдвигает сумму и количество оценок произведения одним UPDATE.
+    Заодно увеличивает версию списка отзывов произведения.
+    """
+    rating_sum = F('rating_sum') + delta_sum
+    rating_count = F('rating_count') + delta_count
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=average(rating_sum, rating_count),
+        reviews_version=F('reviews_version') + 1,
+        reviews_modified=timezone.now()
+    )
+
+
+def touch_reviews(titles):
+    """Увеличивает версию списка отзывов произведений."""
+    titles.update(
+        reviews_version=F('reviews_version') + 1,
+        reviews_modified=timezone.now()
+    )
+
+
+def touch_comments(reviews):
+    """Увеличивает версию списка комментариев отзывов."""
+    reviews.update(
+        comments_version=F('comments_version') + 1,
+        comments_modified=timezone.now()
+    )
+
+
+def touch_modified(objects):
+    """
+    Сдвигает время изменения строк для инкрементальной выгрузки, когда
+    меняется выгружаемое с ними значение связанной таблицы.
+    """
+    objects.update(modified=timezone.now())
+
+
+def review_totals():
+    """Подзапросы с фактическими суммой и количеством оценок произведения."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    return (
+        Coalesce(Subquery(
+            reviews.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField()
+        ), 0),
+        Coalesce(Subquery(
+            reviews.annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ), 0),
+    )
+
+
+def broken_ratings(titles=None):
+    """Произведения, у которых сохранённый рейтинг разошёлся с отзывами."""
+    if titles is None:
+        titles = Title.objects.all()
+    actual_sum, actual_count = review_totals()
+    return titles.annotate(
+        actual_sum=actual_sum,
+        actual_count=actual_count,
+        actual_rating=average(actual_sum, actual_count)
+    ).filter(
+        ~Q(rating_sum=F('actual_sum'))
+        | ~Q(rating_count=F('actual_count'))
+        | Q(rating__isnull=True, actual_rating__isnull=False)
+        | Q(rating__isnull=False, actual_rating__isnull=True)
+        | (Q(rating__isnull=False, actual_rating__isnull=False)
+           & ~Q(rating=F('actual_rating')))
+    )
+
+
+def rebuild_ratings(titles=None):
+    """Пересчитывает рейтинг произведений по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    rating_sum, rating_count = review_totals()
+    return titles.order_by().update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=average(*review_totals()),
+        reviews_version=F('reviews_version') + 1,
+        reviews_modified=timezone.now()
+    )
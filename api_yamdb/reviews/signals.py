@@ -0,0 +1,128 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from . import leaderboard
+from .models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                     Title, User)
+from .rating import (rebuild_ratings, touch_comments, touch_modified,
+                     touch_reviews, update_rating)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    old_title_id, old_score = getattr(
+        instance, '_loaded_rating', (None, None))
+    title_ids = {instance.title_id}
+    if created:
+        update_rating(instance.title_id, instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+    elif old_title_id != instance.title_id:
+        update_rating(old_title_id, -old_score, -1)
+        update_rating(instance.title_id, instance.score, 1)
+        title_ids.add(old_title_id)
+    else:
+        update_rating(instance.title_id, instance.score - old_score, 0)
+    instance.remember_rating()
+    transaction.on_commit(partial(leaderboard.update_scores, title_ids))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    title_id, score = getattr(instance, '_loaded_rating', (None, None))
+    if title_id is None or score is None:
+        title_id, score = instance.title_id, instance.score
+    update_rating(title_id, -score, -1)
+    # После фиксации: при каскадном удалении произведения его уже нет.
+    transaction.on_commit(partial(leaderboard.update_scores, [title_id]))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    touch_comments(Review.objects.filter(pk=instance.review_id))
+
+
+def refresh_on_commit(title):
+    """
+    Строит записи произведения заново после фиксации, один раз
+    на транзакцию: при создании через API жанры задаются после сохранения.
+    """
+    if getattr(title, '_leaderboard_pending', False):
+        return
+    title._leaderboard_pending = True
+
+    def run():
+        title._leaderboard_pending = False
+        leaderboard.refresh(Title.objects.filter(pk=title.pk))
+
+    transaction.on_commit(run)
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, **kwargs):
+    # Списки отзывов и комментариев с прежним именем автора устарели.
+    loaded = getattr(instance, '_loaded_username', instance.username)
+    if created or loaded == instance.username:
+        return
+    touch_reviews(Title.objects.filter(reviews__author=instance))
+    touch_comments(Review.objects.filter(comments__author=instance))
+    touch_modified(Review.objects.filter(author=instance))
+    touch_modified(Comment.objects.filter(author=instance))
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    # Разделы зависят только от категории и жанров.
+    loaded = getattr(instance, '_loaded_category', None)
+    if created or loaded != (instance.category_id,):
+        refresh_on_commit(instance)
+    instance.remember_category()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if reverse and action == 'pre_clear':
+        touch_modified(Title.objects.filter(genre=instance))
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_modified(Title.objects.filter(pk=instance.pk))
+        refresh_on_commit(instance)
+    elif pk_set:
+        touch_modified(Title.objects.filter(pk__in=pk_set))
+        leaderboard.refresh(Title.objects.filter(pk__in=pk_set))
+    else:
+        LeaderboardEntry.objects.filter(scope=f'genre:{instance.pk}').delete()
+
+
+def section_titles(sender, instance):
+    if sender is Genre:
+        return Title.objects.filter(genre=instance)
+    return Title.objects.filter(category=instance)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def section_saved(sender, instance, created, **kwargs):
+    # Слаг раздела выгружается вместе с произведениями.
+    if not created:
+        touch_modified(section_titles(sender, instance))
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Category)
+def section_deleting(sender, instance, **kwargs):
+    touch_modified(section_titles(sender, instance))
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def section_deleted(sender, instance, **kwargs):
+    scope = 'genre' if sender is Genre else 'category'
+    LeaderboardEntry.objects.filter(scope=f'{scope}:{instance.pk}').delete()
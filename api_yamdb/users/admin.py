@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 @admin.register(User)
@@ -12,3 +12,13 @@ class UserAdmin(admin.ModelAdmin):
     list_editable = ('role',)
     search_fields = ('username', 'role',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'recipient', 'subject', 'created', 'attempts', 'next_attempt',
+        'sent', 'last_error',
+    )
+    list_filter = ('sent',)
+    search_fields = ('recipient',)
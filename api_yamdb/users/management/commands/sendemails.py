@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.outbox import deliver
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Emails sent over one mail server connection",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Send what is due now and exit",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent, failed = deliver(options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                if sent + failed < options['batch_size']:
+                    if options['once']:
+                        return
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
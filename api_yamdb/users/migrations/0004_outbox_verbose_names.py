@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:14
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='outboxemail',
+            options={'ordering': ['id'], 'verbose_name': 'Письмо в очереди', 'verbose_name_plural': 'Письма в очереди'},
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Попытки'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='body',
+            field=models.TextField(verbose_name='Текст'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Создано'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='from_email',
+            field=models.EmailField(max_length=254, verbose_name='Отправитель'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='last_error',
+            field=models.TextField(blank=True, verbose_name='Последняя ошибка'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='next_attempt',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='recipient',
+            field=models.EmailField(max_length=254, verbose_name='Получатель'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='sent',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Отправлено'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='subject',
+            field=models.CharField(max_length=255, verbose_name='Тема'),
+        ),
+    ]
@@ -1,5 +1,13 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import caches
+from django.db import models, transaction
+from django.utils import timezone
+
+# Поля, которые попадают в токен доступа: их изменение отзывает токены.
+TOKEN_CLAIMS = ('role', 'is_staff', 'is_superuser', 'is_active')
 
 
 class User(AbstractUser):
@@ -16,10 +24,63 @@ class User(AbstractUser):
     bio = models.TextField(blank=True)
     role = models.SlugField(choices=ROLES, default=USER)
     confirmation_code = models.SlugField(null=True, blank=True)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['id']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_claims()
+        return instance
+
+    def remember_claims(self):
+        self._loaded_claims = tuple(
+            self.__dict__.get(name) for name in TOKEN_CLAIMS)
+        # Имя автора выводится в списках отзывов и комментариев.
+        self._loaded_username = self.__dict__.get('username')
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        loaded = getattr(self, '_loaded_claims', None)
+        changed = loaded is not None and loaded != tuple(
+            getattr(self, name) for name in TOKEN_CLAIMS)
+        if changed:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        if changed:
+            # До фиксации версия читается из БД, после — снова из кэша.
+            caches[settings.AUTH_CACHE].delete(self.token_version_key(self.pk))
+        if adding or changed:
+            transaction.on_commit(partial(
+                self.cache_token_version, self.pk, self.token_version))
+        self.remember_claims()
+
+    @staticmethod
+    def token_version_key(pk):
+        return f'auth:token_version:{pk}'
+
+    @classmethod
+    def cache_token_version(cls, pk, version):
+        caches[settings.AUTH_CACHE].set(
+            cls.token_version_key(pk), version,
+            settings.AUTH_TOKEN_VERSION_TIMEOUT)
+
+    @classmethod
+    def cached_token_version(cls, pk):
+        """Версия токенов пользователя из кэша или БД; None — его нет."""
+        version = caches[settings.AUTH_CACHE].get(cls.token_version_key(pk))
+        if version is None:
+            version = cls.objects.filter(pk=pk).values_list(
+                'token_version', flat=True).first()
+            if version is not None:
+                cls.cache_token_version(pk, version)
+        return version
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -31,3 +92,51 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class ClaimsUser(User):
+    """
+    Пользователь, собранный из claims токена доступа без запроса к БД.
+    Заполнены только id, username и поля TOKEN_CLAIMS, поэтому его нельзя
+    сохранять; для остальных полей нужно загрузить User.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, pk, claims):
+        user = cls(pk=pk, **claims)
+        user._state.adding = False
+        return user
+
+    def save(self, *args, **kwargs):
+        raise TypeError('ClaimsUser is read-only, load the User instead')
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки воркером sendemails."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        indexes = [
+            models.Index(
+                fields=['sent', 'next_attempt'],
+                name='outbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# Пока письмо отправляется, другие воркеры его не берут; если воркер
+# упал, письмо снова станет доступно по истечении аренды. Аренда
+# оставшихся писем порции продлевается после каждого отправленного.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(subject, body, recipient, from_email=None):
+    """Кладёт письмо в очередь; уйдёт после фиксации транзакции."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.ADMIN_EMAIL,
+        recipient=recipient,
+    )
+
+
+def backoff(attempts):
+    """Экспоненциальная пауза перед следующей попыткой."""
+    delay = settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_BACKOFF))
+
+
+def pending():
+    return OutboxEmail.objects.filter(
+        sent__isnull=True,
+        next_attempt__lte=timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim(batch_size):
+    """Забирает порцию писем в аренду; параллельные воркеры их пропустят."""
+    with transaction.atomic():
+        ids = list(
+            pending().select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=ids).update(
+            next_attempt=timezone.now() + LEASE,
+            attempts=F('attempts') + 1,
+        )
+    return list(OutboxEmail.objects.filter(pk__in=ids))
+
+
+def deliver(batch_size):
+    """
+    Отправляет порцию писем через одно SMTP-соединение.
+    Возвращает число отправленных и неотправленных писем.
+    """
+    emails = claim(batch_size)
+    if not emails:
+        return 0, 0
+    sent = []
+    connection = get_connection()
+    try:
+        connection.open()
+        for index, email in enumerate(emails):
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.recipient], connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                fail(email, error)
+            else:
+                sent.append(email.pk)
+                mark_sent(email, emails[index + 1:])
+    except Exception as error:
+        for email in emails:
+            if email.pk not in sent:
+                fail(email, error)
+    finally:
+        connection.close()
+    return len(sent), len(emails) - len(sent)
+
+
+def mark_sent(email, remaining):
+    """
+    Отмечает письмо отправленным сразу, чтобы после истечения аренды
+    его не отправили повторно, и продлевает аренду остальных.
+    """
+    now = timezone.now()
+    OutboxEmail.objects.filter(pk=email.pk).update(sent=now)
+    if remaining:
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in remaining]
+        ).update(next_attempt=now + LEASE)
+
+
+def fail(email, error):
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        next_attempt=timezone.now() + backoff(email.attempts),
+        last_error=f'{type(error).__name__}: {error}',
+    )
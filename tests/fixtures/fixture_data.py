@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.v1.search import search_index
+    from api.v1.throttling import memory_buckets
+    from django.core.cache import cache
+
+    cache.clear()
+    search_index.reset()
+    memory_buckets.clear()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='admin_user', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from api.v1.authentication import access_token_for
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    token = access_token_for(admin)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    """Каталог, в котором каждая страница выдачи заполнена целиком."""
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(6)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(6)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author-{i}', email=f'author-{i}@yamdb.fake'
+        )
+        for i in range(6)
+    ]
+    titles = []
+    for i in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i,
+            description='Описание',
+            category=categories[i]
+        )
+        title.genre.set(genres[i:i + 2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=i + 1)
+        for i, author in enumerate(authors)
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий')
+    return {'title': titles[0], 'review': reviews[0]}
@@ -0,0 +1,117 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def http_scope(path, method='GET', query=b'', headers=()):
+    return {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': [(b'host', b'localhost'), *headers],
+        'http_version': '1.1',
+        'scheme': 'http',
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def call(path, method='GET', query=b'', body=b'', headers=()):
+    from api_yamdb.asgi import application
+
+    scope = http_scope(path, method, query, headers)
+    messages = []
+    requests = [
+        {'type': 'http.request', 'body': body[:1], 'more_body': True},
+        {'type': 'http.request', 'body': body[1:], 'more_body': False},
+    ]
+
+    async def receive():
+        if requests:
+            return requests.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start, *chunks = messages
+    return start['status'], dict(start['headers']), b''.join(
+        chunk['body'] for chunk in chunks)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgi:
+
+    def test_hot_reads(self, catalog):
+        title = catalog['title']
+        status, headers, body = call(f'/api/v1/titles/{title.id}/')
+        assert status == 200
+        assert headers[b'content-type'] == b'application/json'
+        assert json.loads(body)['name'] == title.name
+        status, _, body = call(
+            f'/api/v1/titles/{title.id}/reviews/', query=b'page_size=2')
+        assert status == 200
+        assert len(json.loads(body)['results']) == 2, (
+            'Проверьте, что строка запроса передаётся в Django'
+        )
+
+    def test_request_body(self, admin_client):
+        token = admin_client._credentials['HTTP_AUTHORIZATION']
+        status, _, body = call(
+            '/api/v1/categories/', method='POST',
+            body=json.dumps({'name': 'Кино', 'slug': 'movie'}).encode(),
+            headers=[
+                (b'content-type', b'application/json'),
+                (b'authorization', token.encode()),
+            ],
+        )
+        assert status == 201, (
+            'Проверьте, что тело запроса, пришедшее частями, собирается'
+        )
+        assert json.loads(body)['slug'] == 'movie'
+
+    def test_hot_read_pool(self):
+        from api_yamdb.asgi import HOT_READS
+
+        for path in ('/api/v1/titles/', '/api/v1/titles/1/',
+                     '/api/v1/titles/1/reviews/',
+                     '/api/v1/titles/1/reviews/2/comments/'):
+            assert HOT_READS.match(path), path
+        for path in ('/api/v1/search/', '/api/v1/titles/1/reviews/2/'):
+            assert not HOT_READS.match(path), path
+
+    def test_failed_send_releases_thread(self, monkeypatch):
+        from api_yamdb import asgi
+
+        executor = ThreadPoolExecutor(1)
+        monkeypatch.setattr(asgi, 'default_pool', executor)
+        monkeypatch.setattr(asgi, 'BUFFERED_CHUNKS', 1)
+
+        requests = [{'type': 'http.request'}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            raise ConnectionResetError
+
+        async def request():
+            with pytest.raises(ConnectionResetError):
+                await asgi.application(
+                    http_scope('/api/v1/categories/'), receive, send)
+            # Цикл событий продолжает работать, как на сервере.
+            return await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    executor, lambda: True), 5)
+
+        assert asyncio.run(request()), (
+            'Проверьте, что поток пула освобождается, если отправка ответа '
+            'прервалась'
+        )
+        executor.shutdown()
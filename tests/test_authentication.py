@@ -0,0 +1,85 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def client_for(user):
+    from api.v1.authentication import access_token_for
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def test_no_user_query(self, admin, django_assert_num_queries):
+        client = client_for(admin)
+        client.get('/api/v1/categories/')
+        with django_assert_num_queries(2):
+            response = client.post(
+                '/api/v1/categories/', {'name': 'Кино', 'slug': 'movie'})
+        assert response.status_code == 201, (
+            'Проверьте, что пользователь собирается из токена без запроса'
+        )
+
+    def test_role_change_revokes(self, admin):
+        client = client_for(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        assert client_for(admin).get('/api/v1/users/').status_code == 403
+
+    def test_other_changes_keep_token(self, admin):
+        client = client_for(admin)
+        admin.bio = 'Новая биография'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 200
+
+    def test_cold_cache(self, admin):
+        from django.core.cache import cache
+
+        client = client_for(admin)
+        cache.clear()
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.delete()
+        cache.clear()
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_author_from_claims(self, catalog, django_user_model):
+        reader = django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake')
+        client = client_for(reader)
+        title = catalog['title']
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['author'] == 'reader'
+        url = f'/api/v1/titles/{title.id}/reviews/{response.json()["id"]}/'
+        assert client.patch(url, {'score': 8}).status_code == 200, (
+            'Проверьте, что автор из токена может править свой отзыв'
+        )
+        other = catalog['review']
+        assert client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{other.id}/', {'score': 8}
+        ).status_code == 403
+
+    def test_me_loads_user(self, admin):
+        admin.bio = 'Администратор'
+        admin.save()
+        response = client_for(admin).get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'Администратор'
+        assert response.json()['email'] == admin.email
+
+    def test_legacy_token(self, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+        assert client.get('/api/v1/users/').status_code == 200
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.db.models import F
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmark:
+
+    def test_generated_dataset(self):
+        from reviews.dataset import generate, popularity
+        from reviews.models import Comment, Review, Title
+        from reviews.rating import broken_ratings
+
+        assert popularity(4, 25, 1.0) == [12, 6, 4, 3], (
+            'Проверьте, что отзывы распределяются по закону Ципфа'
+        )
+        assert generate(10, 100, 50) == 10
+        assert Title.objects.count() == 10
+        assert Review.objects.count() == 100
+        assert not broken_ratings().exists(), (
+            'Проверьте, что генератор пересчитывает рейтинги произведений'
+        )
+        dates = Review.objects.order_by('pub_date').values_list(
+            'pub_date', flat=True)
+        assert dates.first() < timezone.now() - timedelta(days=1), (
+            'Проверьте, что отзывы опубликованы за окно в days дней'
+        )
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')).exists(), (
+            'Проверьте, что комментарии опубликованы после отзыва'
+        )
+        assert generate(5, 20, 0) == 5, (
+            'Проверьте, что повторный запуск добавляет произведения'
+        )
+
+    def test_every_route_benchmarked(self):
+        from api import benchmark
+        from reviews.dataset import generate
+        from reviews.models import Review
+
+        generate(3, 12, 12)
+        selected = benchmark.scenarios()
+        assert benchmark.route_names() <= {
+            scenario.route for scenario in selected
+        }, 'Проверьте, что у каждого маршрута API есть сценарий'
+        results = benchmark.run_client(selected, requests=1)
+        failed = [
+            (result.scenario.name, dict(result.statuses))
+            for result in results if result.errors
+        ]
+        assert not failed, 'Проверьте ответы сценариев бенчмарка'
+        assert Review.objects.count() == 12, (
+            'Проверьте, что пишущие сценарии откатываются'
+        )
+        assert all(result.queries for result in results)
+
+    def test_commit_callbacks_measured(self):
+        from api.benchmark import run_on_commit
+        from django.db import transaction
+
+        called = []
+        with transaction.atomic():
+            transaction.on_commit(lambda: called.append(True))
+            run_on_commit()
+            transaction.set_rollback(True)
+        assert called == [True], (
+            'Проверьте, что работа on_commit пишущих сценариев замеряется'
+        )
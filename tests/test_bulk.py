@@ -0,0 +1,177 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def item(self, name, category='category-0', genre=('genre-0',)):
+        return {
+            'name': name, 'year': 2001, 'description': 'Описание',
+            'category': category, 'genre': list(genre),
+        }
+
+    def test_create(self, admin_client, catalog, django_assert_num_queries):
+        from reviews import leaderboard
+        from reviews.models import Title
+
+        data = [
+            self.item(f'Новое {i}', genre=('genre-0', 'genre-1'))
+            for i in range(10)
+        ]
+        admin_client.get('/api/v1/categories/')
+        leaderboard.refresh()
+        # Категории, жанры, вставка произведений, их id и связей
+        # с жанрами, средняя оценка и семь запросов на места в рейтингах,
+        # плюс создание и освобождение точки сохранения.
+        with django_assert_num_queries(15):
+            response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что массовая загрузка произведений возвращает 201'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [201] * 10
+        for i, result in enumerate(results):
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == f'Новое {i}', (
+                'Проверьте, что id в ответе совпадают с порядком запроса'
+            )
+            assert set(title.genre.values_list('slug', flat=True)) == {
+                'genre-0', 'genre-1'}
+
+    def test_partial(self, admin_client, catalog):
+        data = [
+            self.item('Верное'),
+            self.item('Без категории', category='missing'),
+            self.item('Без жанра', genre=('genre-0', 'missing')),
+            {'name': 'Без года'},
+        ]
+        response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 207
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == [201, 400, 400, 400], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert response.json()['created'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalidates_cache(self, admin_client, catalog):
+        client = APIClient()
+        count = client.get('/api/v1/titles/').json()['count']
+        admin_client.post(self.url, [self.item('Новое')], format='json')
+        assert client.get('/api/v1/titles/').json()['count'] == count + 1, (
+            'Проверьте, что массовая загрузка сбрасывает кэш списка'
+        )
+
+    def test_ids_require_returning(self, monkeypatch):
+        from api.v1.bulk import bulk_insert
+        from django.db import NotSupportedError, connection
+        from reviews.models import Category
+
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        with pytest.raises(NotSupportedError):
+            bulk_insert(Category, [Category(name='Новая', slug='new')])
+        assert not Category.objects.filter(slug='new').exists(), (
+            'Проверьте, что поддержка БД проверяется до вставки'
+        )
+
+    def test_not_supported(self, admin_client, catalog, monkeypatch):
+        from django.db import connection
+
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        response = admin_client.post(
+            self.url, [self.item('Новое')], format='json')
+        assert response.status_code == 501
+
+    def test_limits(self, admin_client, catalog, settings):
+        settings.BULK_MAX_ITEMS = 2
+        response = admin_client.post(
+            self.url, [self.item(str(i)) for i in range(3)], format='json')
+        assert response.status_code == 400
+        response = admin_client.post(self.url, {}, format='json')
+        assert response.status_code == 400
+
+    def test_admin_only(self, catalog, django_user_model):
+        user = django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(self.url, [self.item('Новое')], format='json')
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestReviewBulk:
+    url = '/api/v1/reviews/bulk/'
+
+    def test_create_with_authors(self, admin_client, catalog,
+                                 django_assert_num_queries):
+        from reviews import leaderboard
+        from reviews.models import Title
+
+        titles = list(Title.objects.order_by('pk'))
+        data = [
+            {'title': title.pk, 'author': 'admin_user',
+             'text': 'Отзыв', 'score': 10}
+            for title in titles[1:]
+        ] + [
+            {'title': titles[1].pk, 'author': 'author-0',
+             'text': 'Отзыв', 'score': 4},
+        ]
+        admin_client.get('/api/v1/categories/')
+        leaderboard.refresh()
+        # Произведения, авторы, дубликаты, вставка, id, рейтинг, средняя
+        # оценка и пять запросов на места в рейтингах, плюс создание
+        # и освобождение точки сохранения.
+        with django_assert_num_queries(14):
+            response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 201
+        assert response.json()['created'] == len(data)
+        titles[1].refresh_from_db()
+        assert (titles[1].rating_count, titles[1].rating) == (2, 7), (
+            'Проверьте, что массовая загрузка пересчитывает рейтинг'
+        )
+        titles[2].refresh_from_db()
+        assert titles[2].rating == 10
+
+    def test_duplicates(self, admin_client, catalog):
+        title = catalog['title']
+        data = [
+            {'title': title.pk, 'author': 'author-0',
+             'text': 'Повтор', 'score': 5},
+            {'title': title.pk, 'text': 'Первый', 'score': 5},
+            {'title': title.pk, 'text': 'Второй', 'score': 5},
+            {'title': 0, 'text': 'Нет произведения', 'score': 5},
+            {'title': title.pk, 'author': 'nobody',
+             'text': 'Нет автора', 'score': 5},
+            {'title': title.pk, 'text': 'Без оценки', 'score': 11},
+        ]
+        response = admin_client.post(self.url, data, format='json')
+        assert response.status_code == 207
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == [400, 201, 400, 400, 400, 400], (
+            'Проверьте, что повторные отзывы одного автора отклоняются'
+        )
+        title.refresh_from_db()
+        assert title.rating_count == 7
+
+    def test_author_requires_admin(self, catalog, django_user_model):
+        user = django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(user)
+        title = catalog['title']
+        response = client.post(self.url, [
+            {'title': title.pk, 'author': 'author-0',
+             'text': 'Отзыв', 'score': 5},
+            {'title': title.pk, 'text': 'Отзыв', 'score': 5},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [400, 201]
+        assert 'author' in results[0]['errors']
+
+    def test_anonymous(self, catalog):
+        response = APIClient().post(self.url, [], format='json')
+        assert response.status_code == 401
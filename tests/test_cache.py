@@ -0,0 +1,65 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+# Кэш сбрасывается после фиксации транзакции.
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_cached_list(self, django_assert_num_queries, catalog):
+        client = APIClient()
+        first = client.get('/api/v1/titles/?page=2')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/?page=2')
+        assert first.json() == second.json(), (
+            'Проверьте, что повторный запрос отдаёт ответ из кэша'
+        )
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/')
+
+    def test_review_invalidates_titles(self, catalog, django_user_model):
+        from reviews.models import Review
+
+        client = APIClient()
+        url = f'/api/v1/titles/{catalog["title"].id}/'
+        assert client.get(url).json()['rating'] == 3
+        Review.objects.filter(title=catalog['title'], score=1).delete()
+        assert client.get(url).json()['rating'] == 4, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/', '/api/v1/genres/'])
+    def test_write_invalidates(self, admin_client, catalog, url):
+        count = admin_client.get(url).json()['count']
+        admin_client.post(url, {'name': 'Новый', 'slug': 'new'})
+        assert admin_client.get(url).json()['count'] == count + 1, (
+            f'Проверьте, что запись сбрасывает кэш `{url}`'
+        )
+
+    def test_invalidated_after_commit(self, catalog):
+        from api.v1.cache import cache, generation_key
+        from django.db import transaction
+        from reviews.models import Review
+
+        client = APIClient()
+        url = f'/api/v1/titles/{catalog["title"].id}/'
+        client.get(url)
+        generation = cache.get(generation_key('titles'))
+        with transaction.atomic():
+            Review.objects.filter(title=catalog['title'], score=1).delete()
+            # Чтение до фиксации видит прежние данные и кэширует их
+            # под прежним поколением.
+            assert cache.get(generation_key('titles')) == generation, (
+                'Проверьте, что кэш сбрасывается только после фиксации'
+            )
+        assert cache.get(generation_key('titles')) != generation
+        assert client.get(url).json()['rating'] == 4
+
+    def test_stats(self, admin_client, catalog):
+        APIClient().get('/api/v1/genres/')
+        APIClient().get('/api/v1/genres/')
+        response = admin_client.get('/api/v1/cache/')
+        assert response.json()['genres'] == {
+            'hits': 1, 'misses': 1, 'hit_ratio': 0.5
+        }
+        assert APIClient().get('/api/v1/cache/').status_code == 401
@@ -0,0 +1,64 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def urls(self, catalog):
+        title, review = catalog['title'].id, catalog['review'].id
+        return (
+            f'/api/v1/titles/{title}/reviews/',
+            f'/api/v1/titles/{title}/reviews/{review}/comments/',
+        )
+
+    @pytest.mark.parametrize('index', [0, 1])
+    def test_not_modified(self, django_assert_num_queries, catalog, index):
+        client = APIClient()
+        url = self.urls(catalog)[index]
+        response = client.get(url)
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified')
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304, (
+            f'Проверьте, что `{url}` отвечает 304 на совпавший ETag'
+        )
+
+    def test_review_changes_etag(self, catalog):
+        client = APIClient()
+        reviews_url, comments_url = self.urls(catalog)
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+        review = catalog['review']
+        review.text = 'Новый текст'
+        review.save()
+        review.comments.first().delete()
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == 200
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200
+
+    def test_author_renamed(self, catalog):
+        client = APIClient()
+        urls = self.urls(catalog)
+        etags = [client.get(url)['ETag'] for url in urls]
+        author = catalog['review'].comments.first().author
+        author.username = 'renamed'
+        author.save()
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что смена имени автора меняет ETag `{url}`'
+            )
+
+    def test_page_changes_etag(self, catalog):
+        client = APIClient()
+        url = self.urls(catalog)[0]
+        assert client.get(url)['ETag'] != client.get(f'{url}?page=2')['ETag']
+
+    def test_no_content_etag(self, catalog):
+        response = APIClient().get('/api/v1/genres/')
+        assert not response.has_header('ETag'), (
+            'Проверьте, что ETag ставят только версии родительских объектов'
+        )
@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3 import base as sqlite3
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def pool(self, size=2, timeout=0.01):
+        from api_yamdb.db.pool import ConnectionPool
+
+        return ConnectionPool(size, timeout)
+
+    def test_reuse(self):
+        pool = self.pool()
+        first = pool.acquire(FakeConnection)
+        pool.release(first)
+        assert pool.acquire(FakeConnection) is first, (
+            'Проверьте, что пул выдаёт возвращённое соединение повторно'
+        )
+        assert pool.opened == 1
+
+    def test_bounded(self):
+        from api_yamdb.db.pool import PoolTimeoutError
+
+        pool = self.pool(size=1)
+        pool.acquire(FakeConnection)
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(FakeConnection)
+
+    def test_broken_connection_frees_slot(self):
+        pool = self.pool(size=1)
+        broken = pool.acquire(FakeConnection)
+        pool.release(broken, reusable=False)
+        assert broken.closed
+        assert pool.acquire(FakeConnection) is not broken
+        assert pool.opened == 1
+
+    def test_failed_check_replaces_connection(self):
+        pool = self.pool(size=1)
+        stale = pool.acquire(FakeConnection)
+        pool.release(stale)
+        fresh = pool.acquire(FakeConnection, check=lambda conn: False)
+        assert stale.closed and fresh is not stale
+        assert pool.opened == 1
+
+    def test_failed_connect_frees_slot(self):
+        pool = self.pool(size=1)
+
+        def connect():
+            raise OSError
+
+        with pytest.raises(OSError):
+            pool.acquire(connect)
+        assert pool.opened == 0
+        pool.acquire(FakeConnection)
+
+
+@pytest.mark.django_db
+class TestPooledConnectionMixin:
+
+    @pytest.fixture
+    def wrapper(self, tmp_path):
+        from api_yamdb.db.pool import PooledConnectionMixin, close_pool
+
+        class Wrapper(PooledConnectionMixin, sqlite3.DatabaseWrapper):
+            pass
+
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'POOL': {'SIZE': 1, 'TIMEOUT': 0.01},
+        }
+        wrapper = Wrapper(settings_dict, alias='pool_test')
+        yield wrapper
+        wrapper.close()
+        close_pool('pool_test')
+
+    def test_close_returns_connection_to_pool(self, wrapper):
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close_if_unusable_or_obsolete()
+        assert wrapper.connection is None
+        wrapper.ensure_connection()
+        assert wrapper.connection is raw, (
+            'Проверьте, что закрытое соединение возвращается в пул'
+        )
+
+    def test_pool_timeout(self, wrapper):
+        from django.db import OperationalError
+
+        wrapper.ensure_connection()
+        other = type(wrapper)(wrapper.settings_dict, alias='pool_test')
+        with pytest.raises(OperationalError):
+            other.ensure_connection()
+
+    def test_pool_requires_closing(self, wrapper):
+        from django.core.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured):
+            type(wrapper)(
+                {**wrapper.settings_dict, 'CONN_MAX_AGE': 60},
+                alias='pool_test')
+
+    def test_health_check(self, wrapper, monkeypatch):
+        wrapper.settings_dict.update(
+            CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True, POOL=None)
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close_if_unusable_or_obsolete()
+        monkeypatch.setattr(wrapper, 'is_usable', lambda: False)
+        wrapper.cursor().close()
+        assert wrapper.connection is not raw, (
+            'Проверьте, что соединение, не прошедшее проверку, '
+            'заменяется новым'
+        )
+        monkeypatch.undo()
+        raw = wrapper.connection
+        wrapper.cursor().close()
+        assert wrapper.connection is raw
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def content(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся StreamingHttpResponse'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+def ndjson(response):
+    return [json.loads(line) for line in content(response).splitlines()]
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_ndjson(self, admin_client, catalog):
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = ndjson(response)
+        assert len(rows) == 6
+        first = rows[0]
+        assert first['id'] == catalog['title'].id
+        assert first['category'] == 'category-0'
+        assert first['genre'] == ['genre-0', 'genre-1'], (
+            'Проверьте, что в выгрузке произведений есть слаги жанров'
+        )
+        assert first['rating'] == 3
+
+    def test_csv(self, admin_client, catalog):
+        response = admin_client.get('/api/v1/export/titles/?format=csv')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert len(rows) == 6
+        assert rows[0]['genre'] == 'genre-0,genre-1'
+
+    @pytest.mark.parametrize('kind,count', [
+        ('reviews', 6), ('comments', 6), ('genres', 6), ('categories', 6),
+    ])
+    def test_kinds(self, admin_client, catalog, kind, count):
+        rows = ndjson(admin_client.get(f'/api/v1/export/{kind}/'))
+        assert len(rows) == count
+
+    def test_chunks(self, admin_client, catalog, settings,
+                    django_assert_num_queries):
+        settings.EXPORT_CHUNK_SIZE = 2
+        admin_client.get('/api/v1/categories/')
+        response = admin_client.get('/api/v1/export/titles/')
+        # Произведения и по запросу жанров на каждую порцию из двух.
+        with django_assert_num_queries(4):
+            rows = ndjson(response)
+        assert [row['id'] for row in rows] == sorted(
+            row['id'] for row in rows)
+
+    def test_updated_since(self, admin_client, catalog):
+        from reviews.models import Review, Title
+
+        response = admin_client.get('/api/v1/export/reviews/')
+        since = response['X-Export-Timestamp']
+        content(response)
+        review = Review.objects.order_by('pk').last()
+        review.text = 'Исправленный отзыв'
+        review.save()
+        rows = ndjson(admin_client.get(
+            '/api/v1/export/reviews/', {'updated_since': since}))
+        assert [row['id'] for row in rows] == [review.id], (
+            'Проверьте, что updated_since отдаёт только изменённые строки'
+        )
+        titles = ndjson(admin_client.get(
+            '/api/v1/export/titles/', {'updated_since': since}))
+        assert [row['id'] for row in titles] == [review.title_id], (
+            'Проверьте, что изменение отзывов выгружает произведение'
+        )
+        future = Title.objects.get(pk=review.title_id).modified
+        rows = ndjson(admin_client.get(
+            '/api/v1/export/categories/',
+            {'updated_since': (future + timedelta(days=1)).isoformat()}))
+        assert len(rows) == 6
+
+    def test_related_changes(self, admin_client, catalog):
+        from reviews.models import Genre, Review, Title
+
+        response = admin_client.get('/api/v1/export/titles/')
+        since = response['X-Export-Timestamp']
+        content(response)
+
+        def changed(kind):
+            return {row['id'] for row in ndjson(admin_client.get(
+                f'/api/v1/export/{kind}/', {'updated_since': since}))}
+
+        title = Title.objects.order_by('pk').last()
+        title.genre.add(Genre.objects.order_by('pk').first())
+        assert changed('titles') == {title.id}, (
+            'Проверьте, что смена жанров выгружает произведение'
+        )
+        review = Review.objects.order_by('pk').first()
+        review.author.username = 'renamed'
+        review.author.save()
+        assert review.id in changed('reviews'), (
+            'Проверьте, что смена имени автора выгружает его отзывы'
+        )
+        genre = Genre.objects.get(slug='genre-1')
+        titles = set(Title.objects.filter(genre=genre).values_list(
+            'pk', flat=True))
+        genre.delete()
+        assert titles <= changed('titles'), (
+            'Проверьте, что удаление жанра выгружает его произведения'
+        )
+
+    def test_errors(self, admin_client, catalog):
+        response = admin_client.get(
+            '/api/v1/export/titles/', {'updated_since': 'вчера'})
+        assert response.status_code == 400
+        assert 'updated_since' in json.loads(response.content)
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+
+    def test_admin_only(self, catalog):
+        assert APIClient().get('/api/v1/export/titles/').status_code == 401
@@ -0,0 +1,24 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    @pytest.mark.parametrize('query, count', [
+        ('genre=genre-1', 2),
+        ('genre=genre', 0),
+        ('genre=genre&substring=true', 6),
+        ('category=category-1', 1),
+        ('category=category&substring=true', 6),
+        ('year=2003', 1),
+        ('year=200', 0),
+        ('name=произведение 3', 1),
+        ('name=ПРОИЗВЕДЕНИЕ', 6),
+        ('name=.*', 0),
+    ])
+    def test_title_filter(self, catalog, query, count):
+        response = APIClient().get(f'/api/v1/titles/?{query}')
+        assert response.json()['count'] == count, (
+            f'Проверьте фильтрацию произведений по запросу `{query}`'
+        )
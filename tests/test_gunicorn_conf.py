@@ -0,0 +1,49 @@
+import os
+import re
+import runpy
+
+from .conftest import root_dir
+
+app_dir = os.path.join(root_dir, 'api_yamdb')
+
+
+def load_config():
+    return runpy.run_path(os.path.join(app_dir, 'gunicorn.conf.py'))
+
+
+class TestGunicornConfig:
+
+    def test_defaults(self, monkeypatch):
+        for name in list(os.environ):
+            if name.startswith('GUNICORN_'):
+                monkeypatch.delenv(name)
+        config = load_config()
+        assert config['bind'] == '0.0.0.0:8000'
+        assert config['workers'] == config['cpu_count']() * 2 + 1, (
+            'Проверьте, что число воркеров по умолчанию зависит от числа CPU'
+        )
+        assert config['worker_class'] == 'gthread'
+        assert config['preload_app'] is True
+        assert 0 < config['max_requests_jitter'] < config['max_requests']
+
+    def test_env(self, monkeypatch):
+        monkeypatch.setenv('GUNICORN_WORKERS', '3')
+        monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'sync')
+        monkeypatch.setenv('GUNICORN_THREADS', '1')
+        monkeypatch.setenv('GUNICORN_PRELOAD', 'false')
+        monkeypatch.setenv('GUNICORN_MAX_REQUESTS', '0')
+        monkeypatch.setenv('GUNICORN_TIMEOUT', '60')
+        config = load_config()
+        assert (
+            config['workers'], config['worker_class'], config['threads'],
+            config['preload_app'], config['max_requests'], config['timeout'],
+        ) == (3, 'sync', 1, False, 0, 60), (
+            'Проверьте, что gunicorn.conf.py читает переменные GUNICORN_*'
+        )
+
+    def test_dockerfile_uses_config(self):
+        with open(os.path.join(app_dir, 'Dockerfile')) as file:
+            dockerfile = file.read()
+        assert re.search(r'CMD .*"--config", "gunicorn.conf.py"', dockerfile), (
+            'Проверьте, что Dockerfile запускает gunicorn с gunicorn.conf.py'
+        )
@@ -0,0 +1,68 @@
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def registry():
+    from api.instrumentation import registry
+
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def test_sampling_off(self, catalog, registry):
+        response = APIClient().get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без сэмплирования запрос не замеряется'
+        )
+        assert not registry.snapshot()['routes']
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_server_timing(self, catalog, registry):
+        title = catalog['title']
+        response = APIClient().get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        for name in ('db', 'serializer', 'view', 'render', 'total'):
+            assert f'{name};dur=' in timing, (
+                f'Проверьте, что Server-Timing содержит этап {name}'
+            )
+        assert 'queries"' in timing
+        route = registry.snapshot()['routes']['GET review-list']
+        assert route['requests'] == 1
+        assert route['mean']['queries'] > 0
+        assert route['mean']['serializer'] > 0
+        assert sum(route['histogram'].values()) == 1
+
+    def test_duplicate_queries(self):
+        from api.instrumentation import RequestMetrics
+
+        metrics = RequestMetrics()
+        for pk in range(4):
+            metrics(lambda *args: None,
+                    'SELECT * FROM t WHERE id = %s', (pk,), False, {})
+        metrics(lambda *args: None, 'SELECT 1', (), False, {})
+        for size in (1, 2, 3):
+            metrics(lambda *args: None,
+                    f'SELECT * FROM t WHERE id IN ({", ".join(["%s"] * size)})',
+                    tuple(range(size)), False, {})
+        assert metrics.query_count == 8
+        assert metrics.duplicates(3) == {
+            'SELECT * FROM t WHERE id = %s': 4,
+            'SELECT * FROM t WHERE id IN (...)': 3,
+        }, 'Проверьте поиск повторяющихся запросов (N+1)'
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+    def test_metrics_endpoint(self, admin_client, catalog, registry):
+        APIClient().get('/api/v1/categories/')
+        assert APIClient().get('/api/v1/metrics/').status_code == 401
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert 'GET category-list' in response.json()['routes']
+        assert admin_client.delete('/api/v1/metrics/').status_code == 204
+        assert 'GET category-list' not in registry.snapshot()['routes']
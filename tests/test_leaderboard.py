@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def board(django_user_model):
+    """
+    Произведения, у которых средняя оценка и байесовская расходятся:
+    единственная десятка не должна обгонять двадцать девяток.
+    """
+    from django.utils import timezone
+    from reviews import leaderboard
+    from reviews.models import Category, Genre, Review, Title
+
+    category = Category.objects.create(name='Фильмы', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    other = Genre.objects.create(name='Комедия', slug='comedy')
+    users = [
+        django_user_model.objects.create_user(
+            username=f'user-{i}', email=f'user-{i}@yamdb.fake')
+        for i in range(20)
+    ]
+    titles = {}
+    for name, scores in (('many', [9] * 20), ('one', [10]), ('bad', [2] * 5)):
+        title = Title.objects.create(
+            name=name, year=2000, description='', category=category)
+        title.genre.set([genre] if name != 'bad' else [other])
+        for user, score in zip(users, scores):
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=score)
+        titles[name] = title
+    Review.objects.filter(title=titles['many']).update(
+        pub_date=timezone.now() - timedelta(days=30))
+    leaderboard.refresh()
+    return titles
+
+
+def names(response):
+    assert response.status_code == 200
+    return [entry['title']['name'] for entry in response.json()]
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    def test_top(self, board, django_assert_num_queries):
+        client = APIClient()
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/top/')
+        assert names(response) == ['many', 'one', 'bad'], (
+            'Проверьте, что рейтинг учитывает число оценок'
+        )
+        first = response.json()[0]
+        assert first['score'] == pytest.approx(
+            (10 * 200 / 26 + 180) / 30)
+        assert first['title']['rating'] == 9
+
+    def test_trending(self, board):
+        names_ = names(APIClient().get('/api/v1/titles/trending/'))
+        assert names_ == ['one'], (
+            'Проверьте, что в популярных только недавние отзывы '
+            'выше средней оценки'
+        )
+
+    def test_prior_stored(self, board):
+        from reviews import leaderboard
+        from reviews.models import LeaderboardPrior
+
+        assert LeaderboardPrior.objects.get().value == pytest.approx(200 / 26)
+        LeaderboardPrior.objects.update(value=9)
+        assert leaderboard.prior() == 9, (
+            'Проверьте, что средняя оценка читается из БД, '
+            'куда её пишет refreshleaderboards'
+        )
+
+    def test_tie_break_by_id(self, board):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            APIClient().get('/api/v1/titles/top/')
+        sql = context.captured_queries[0]['sql']
+        assert 'ORDER BY "reviews_leaderboardentry"."score" DESC, ' \
+            '"reviews_leaderboardentry"."title_id" ASC' in sql, (
+            'Проверьте, что рейтинг сортируется по индексу без JOIN'
+        )
+
+    def test_scopes(self, board):
+        client = APIClient()
+        assert names(client.get('/api/v1/titles/top/?genre=drama')) == [
+            'many', 'one']
+        assert names(client.get('/api/v1/titles/top/?genre=comedy')) == [
+            'bad']
+        assert len(names(client.get(
+            '/api/v1/titles/top/?category=movie'))) == 3
+        assert names(client.get('/api/v1/titles/top/?limit=1')) == ['many']
+
+    def test_errors(self, board):
+        client = APIClient()
+        assert client.get(
+            '/api/v1/titles/top/?genre=missing').status_code == 404
+        assert client.get(
+            '/api/v1/titles/top/?genre=drama&category=movie'
+        ).status_code == 400
+        assert client.get('/api/v1/titles/top/?limit=0').status_code == 400
+        assert client.get('/api/v1/titles/top/?limit=x').status_code == 400
+
+    def test_section_deleted(self, board):
+        from reviews.models import Category, LeaderboardEntry
+
+        Category.objects.get(slug='movie').delete()
+        assert not LeaderboardEntry.objects.filter(
+            scope__startswith='category:').exists()
+
+
+# Разделы и оценки обновляются после фиксации транзакции.
+@pytest.mark.django_db(transaction=True)
+class TestUpdates:
+
+    def test_incremental(self, board, django_user_model):
+        from reviews.models import Review
+
+        assert names(APIClient().get('/api/v1/titles/trending/')) == ['one']
+        for i in range(5):
+            user = django_user_model.objects.create_user(
+                username=f'fan-{i}', email=f'fan-{i}@yamdb.fake')
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.post(
+                f'/api/v1/titles/{board["many"].id}/reviews/',
+                {'text': 'Отзыв', 'score': 10})
+            assert response.status_code == 201
+        assert names(APIClient().get('/api/v1/titles/trending/')) == [
+            'many', 'one'], (
+            'Проверьте, что новые отзывы сразу меняют рейтинг'
+        )
+        Review.objects.filter(title=board['many']).delete()
+        assert names(APIClient().get('/api/v1/titles/trending/')) == ['one']
+        board['one'].delete()
+        assert names(APIClient().get('/api/v1/titles/trending/')) == []
+
+    def test_genre_change(self, board):
+        board['bad'].genre.add(board['many'].genre.get())
+        assert names(APIClient().get('/api/v1/titles/top/?genre=drama')) == [
+            'many', 'one', 'bad'], (
+            'Проверьте, что смена жанров обновляет разделы рейтинга'
+        )
+
+    def test_category_change(self, board, django_assert_num_queries):
+        from reviews.models import Category
+
+        title = board['bad']
+        title.description = 'Описание'
+        with django_assert_num_queries(1):
+            title.save()
+        title.category = Category.objects.create(name='Книги', slug='book')
+        title.save()
+        assert names(APIClient().get('/api/v1/titles/top/?category=book')) == [
+            'bad'], (
+            'Проверьте, что смена категории обновляет разделы рейтинга'
+        )
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestLoadDb:
+
+    def test_keeps_csv_dates(self):
+        from reviews.models import Comment, Review
+
+        call_command('loaddb', stdout=StringIO())
+        assert Review.objects.get(pk=1).pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc), (
+            'Проверьте, что loaddb сохраняет дату отзыва из CSV'
+        )
+        assert Comment.objects.get(pk=1).pub_date == datetime(
+            2020, 1, 13, 23, 20, 2, 422000, tzinfo=timezone.utc)
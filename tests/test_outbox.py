@@ -0,0 +1,105 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CountingBackend(EmailBackend):
+    """Запоминает, сколько писем уже отмечено отправленными."""
+    marked = []
+
+    def send_messages(self, email_messages):
+        from users.models import OutboxEmail
+
+        self.marked.append(
+            OutboxEmail.objects.filter(sent__isnull=False).count())
+        return super().send_messages(email_messages)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def signup(self):
+        return APIClient().post('/api/v1/auth/signup/', {
+            'username': 'reader', 'email': 'reader@yamdb.fake'})
+
+    def test_signup_enqueues(self):
+        from users.models import OutboxEmail
+
+        assert self.signup().status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что signup не отправляет письмо в запросе'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'reader@yamdb.fake'
+        assert email.sent is None
+
+    def test_deliver_batch(self, django_user_model):
+        from users.models import OutboxEmail
+        from users.outbox import deliver, enqueue
+
+        for i in range(3):
+            enqueue('Тема', f'Письмо {i}', f'user{i}@yamdb.fake')
+        assert deliver(2) == (2, 0)
+        assert deliver(2) == (1, 0)
+        assert deliver(2) == (0, 0)
+        assert [message.to for message in mail.outbox] == [
+            ['user0@yamdb.fake'], ['user1@yamdb.fake'], ['user2@yamdb.fake']
+        ]
+        assert not OutboxEmail.objects.filter(sent__isnull=True).exists()
+
+    def test_marked_sent_one_by_one(self):
+        from users.outbox import deliver, enqueue
+
+        for i in range(3):
+            enqueue('Тема', f'Письмо {i}', f'user{i}@yamdb.fake')
+        CountingBackend.marked = []
+        with override_settings(
+            EMAIL_BACKEND='tests.test_outbox.CountingBackend'
+        ):
+            assert deliver(3) == (3, 0)
+        assert CountingBackend.marked == [0, 1, 2], (
+            'Проверьте, что письмо отмечается отправленным сразу, '
+            'а не после всей порции'
+        )
+
+    def test_retry_with_backoff(self):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+        from users.outbox import deliver, enqueue
+
+        enqueue('Тема', 'Письмо', 'user@yamdb.fake')
+        with override_settings(
+            EMAIL_BACKEND='tests.test_outbox.FailingBackend'
+        ):
+            assert deliver(10) == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.next_attempt > timezone.now(), (
+            'Проверьте, что повтор откладывается'
+        )
+        assert deliver(10) == (0, 0)
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        assert deliver(10) == (1, 0), (
+            'Проверьте, что письмо отправляется после паузы'
+        )
+        assert OutboxEmail.objects.get().attempts == 2
+
+    def test_max_attempts(self, settings):
+        from users.models import OutboxEmail
+        from users.outbox import deliver, enqueue
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 1
+        enqueue('Тема', 'Письмо', 'user@yamdb.fake')
+        OutboxEmail.objects.update(attempts=1)
+        assert deliver(10) == (0, 0), (
+            'Проверьте, что исчерпавшие попытки письма не отправляются'
+        )
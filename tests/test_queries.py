@@ -0,0 +1,176 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestListQueries:
+    """Число SQL-запросов эндпоинтов не должно зависеть от размера выдачи."""
+
+    def assert_queries(self, django_assert_num_queries, client, url, count):
+        with django_assert_num_queries(count):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return response
+
+    def test_titles_list(self, django_assert_num_queries, catalog):
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(), '/api/v1/titles/', 3
+        )
+        assert len(response.json()['results']) == 5
+
+    def test_title_detail(self, django_assert_num_queries, catalog):
+        url = f'/api/v1/titles/{catalog["title"].id}/'
+        self.assert_queries(django_assert_num_queries, APIClient(), url, 2)
+
+    def test_reviews_list(self, django_assert_num_queries, catalog):
+        url = f'/api/v1/titles/{catalog["title"].id}/reviews/'
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(), url, 3
+        )
+        assert len(response.json()['results']) == 5
+
+    def test_comments_list(self, django_assert_num_queries, catalog):
+        url = (
+            f'/api/v1/titles/{catalog["title"].id}/reviews/'
+            f'{catalog["review"].id}/comments/'
+        )
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(), url, 3
+        )
+        assert len(response.json()['results']) == 5
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/', '/api/v1/genres/'])
+    def test_dictionary_list(self, django_assert_num_queries, catalog, url):
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(), url, 2
+        )
+        assert len(response.json()['results']) == 5
+
+    def test_users_list(self, django_assert_num_queries, catalog,
+                        admin_client):
+        response = self.assert_queries(
+            django_assert_num_queries, admin_client, '/api/v1/users/', 3
+        )
+        assert len(response.json()['results']) == 5
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/{title}/reviews/?pagination=cursor',
+        '/api/v1/titles/{title}/reviews/{review}/comments/?pagination=cursor',
+    ])
+    def test_cursor_list(self, django_assert_num_queries, catalog, url):
+        url = url.format(
+            title=catalog['title'].id, review=catalog['review'].id)
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(), url, 2
+        )
+        assert 'count' not in response.json(), (
+            'Проверьте, что курсорная пагинация не считает объекты выдачи'
+        )
+        assert len(response.json()['results']) == 5
+
+    def test_titles_cursor_list(self, django_assert_num_queries, catalog):
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(),
+            '/api/v1/titles/?pagination=cursor', 2
+        )
+        response = self.assert_queries(
+            django_assert_num_queries, APIClient(),
+            response.json()['next'], 2
+        )
+        assert [title['name'] for title in response.json()['results']] == [
+            'Произведение 5'
+        ]
+
+    def test_cursor_same_names(self, catalog):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Title
+
+        ids = sorted(
+            Title.objects.create(
+                name='Twin', year=2000, description='Описание').pk
+            for _ in range(3)
+        )
+        client = APIClient()
+        url = '/api/v1/titles/?pagination=cursor&page_size=1&name=Twin'
+        seen = []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                response = client.get(url).json()
+                seen += [title['id'] for title in response['results']]
+                previous, url = response['previous'], response['next']
+        assert seen == ids, (
+            'Проверьте, что курсор проходит одинаковые имена по id'
+        )
+        assert not any('OFFSET' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что курсор не использует OFFSET'
+        )
+        response = client.get(previous).json()
+        assert [title['id'] for title in response['results']] == ids[1:2]
+
+
+@pytest.mark.django_db
+class TestCreateQueries:
+    """Родительский объект ищется один раз, дубликаты ловит ограничение."""
+
+    def client(self, django_user_model):
+        user = django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake')
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_create_review(self, django_assert_num_queries, catalog,
+                           django_user_model):
+        client = self.client(django_user_model)
+        url = f'/api/v1/titles/{catalog["title"].id}/reviews/'
+        # Произведение, вставка и рейтинг в точке сохранения.
+        with django_assert_num_queries(5):
+            response = client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        # Произведение, вставка, откатанная до точки сохранения,
+        # и проверка, что отзыв автора уже есть.
+        with django_assert_num_queries(6):
+            response = client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв возвращает 400'
+        )
+        assert 'non_field_errors' in response.json()
+
+    def test_other_integrity_error(self, catalog, django_user_model,
+                                   monkeypatch):
+        from api.v1.serializers import ReviewSerializers
+        from django.db import IntegrityError
+
+        def save(self, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(ReviewSerializers, 'save', save)
+        client = self.client(django_user_model)
+        url = f'/api/v1/titles/{catalog["title"].id}/reviews/'
+        with pytest.raises(IntegrityError):
+            client.post(url, {'text': 'Отзыв', 'score': 5})
+
+    def test_create_comment(self, django_assert_num_queries, catalog,
+                            django_user_model):
+        client = self.client(django_user_model)
+        url = (
+            f'/api/v1/titles/{catalog["title"].id}/reviews/'
+            f'{catalog["review"].id}/comments/'
+        )
+        # Отзыв, вставка и версия комментариев в точке сохранения.
+        with django_assert_num_queries(5):
+            response = client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 201
+
+    def test_missing_parent(self, catalog, django_user_model):
+        client = self.client(django_user_model)
+        response = client.post(
+            '/api/v1/titles/0/reviews/', {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 404
+        response = client.get(
+            f'/api/v1/titles/0/reviews/{catalog["review"].id}/comments/')
+        assert response.status_code == 404
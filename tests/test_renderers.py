@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+
+class TestFastJSON:
+
+    def render(self, data, media_type='application/json'):
+        from api.v1.renderers import FastJSONRenderer
+
+        return FastJSONRenderer().render(data, media_type)
+
+    @pytest.mark.parametrize('data', [
+        {'text': 'Отзыв', 'score': 10, 'rating': None, 'genre': []},
+        {'pub_date': datetime(2022, 1, 2, 3, 4, 5, tzinfo=timezone.utc)},
+        {'value': Decimal('1.50'), 1: 'ключ'},
+        [{'nested': {'list': [1, 2.5, True]}}],
+    ])
+    def test_same_as_json(self, data):
+        assert self.render(data) == JSONRenderer().render(data), (
+            'Проверьте, что рендерер выдаёт тот же JSON, что и JSONRenderer'
+        )
+
+    def test_line_separators(self):
+        assert self.render({'text': 'a\u2028b\u2029'}) == (
+            b'{"text":"a\\u2028b\\u2029"}')
+
+    def test_indent(self):
+        rendered = self.render({'a': 1}, 'application/json; indent=2')
+        assert rendered == b'{\n  "a": 1\n}'
+
+    def test_fallback(self, monkeypatch):
+        from api.v1 import renderers
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        data = {'text': 'Отзыв'}
+        assert self.render(data) == JSONRenderer().render(data)
+
+    def test_parser(self):
+        import io
+
+        from api.v1.renderers import FastJSONParser
+        from rest_framework.exceptions import ParseError
+
+        parser = FastJSONParser()
+        assert parser.parse(io.BytesIO('{"text": "Отзыв"}'.encode())) == {
+            'text': 'Отзыв'}
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"text": '))
+
+
+@pytest.mark.django_db
+class TestFastJSONApi:
+
+    def test_response(self, catalog):
+        response = APIClient().get('/api/v1/titles/')
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(response.content)['count'] == 6
+
+    def test_request(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', '{"name": "Кино", "slug": "movie"}',
+            content_type='application/json')
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/categories/', '{"name": ',
+            content_type='application/json')
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON возвращает 400'
+        )
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from django.db import connections, transaction
+
+from .test_authentication import client_for
+
+REPLICA = 'replica1'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Вторая SQLite-база в роли реплики с таблицами пользователей."""
+    from reviews.models import Category
+    from users.models import User
+
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    settings.DATABASE_ROUTERS = ['api_yamdb.db.replicas.ReplicaRouter']
+    with connections[REPLICA].schema_editor() as editor:
+        editor.create_model(User)
+        editor.create_model(Category)
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+def copy_to_replica(*objs):
+    for obj in objs:
+        type(obj).objects.using(REPLICA).bulk_create([obj])
+
+
+def usernames(response):
+    return {user['username'] for user in response.data['results']}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    @pytest.fixture
+    def replica_user(self, replica, admin, django_user_model):
+        copy_to_replica(admin)
+        return django_user_model.objects.db_manager(REPLICA).create(
+            username='replica_user', email='replica@yamdb.fake')
+
+    def test_reads_go_to_replica(self, admin, replica_user):
+        response = client_for(admin).get('/api/v1/users/')
+        assert response.status_code == 200
+        assert 'replica_user' in usernames(response), (
+            'Проверьте, что GET-запросы к API читают из реплики'
+        )
+
+    def test_writes_pin_primary(self, admin, replica_user):
+        client = client_for(admin)
+        response = client.patch(
+            f'/api/v1/users/{admin.username}/', {'bio': 'Новая биография'})
+        assert response.status_code == 200
+        response = client.get('/api/v1/users/')
+        assert 'replica_user' not in usernames(response), (
+            'Проверьте, что после записи клиент читает из основной БД'
+        )
+        assert response.data['results'][0]['bio'] == 'Новая биография'
+        assert 'replica_user' in usernames(
+            client_for(admin).get('/api/v1/users/')), (
+            'Проверьте, что другие сессии по-прежнему читают из реплики'
+        )
+
+    def test_pin_expires(self, admin, replica_user, settings):
+        settings.DB_REPLICA_PIN_SECONDS = -1
+        client = client_for(admin)
+        client.patch(f'/api/v1/users/{admin.username}/', {'bio': 'Био'})
+        assert 'replica_user' in usernames(client.get('/api/v1/users/'))
+
+    def test_cache_filled_from_primary(self, admin, replica):
+        from reviews.models import Category
+
+        Category.objects.db_manager(REPLICA).create(
+            name='Только в реплике', slug='replica')
+        response = client_for(admin).get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert response.data['results'] == [], (
+            'Проверьте, что кэшируемые ответы строятся по основной БД'
+        )
+
+    def test_export_streams_from_replica(self, admin, replica):
+        from reviews.models import Category
+
+        Category.objects.db_manager(REPLICA).create(
+            name='Только в реплике', slug='replica')
+        response = client_for(admin).get('/api/v1/export/categories/')
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(row)['slug'] for row in rows] == ['replica'], (
+            'Проверьте, что выгрузка читает реплику, выбранную для запроса'
+        )
+
+
+class TestReplicaRouter:
+
+    @pytest.fixture
+    def router(self):
+        from api_yamdb.db.replicas import ReplicaRouter, current
+
+        token = current.set(REPLICA)
+        yield ReplicaRouter()
+        current.reset(token)
+
+    def test_primary_by_default(self):
+        from api_yamdb.db.replicas import ReplicaRouter
+
+        assert ReplicaRouter().db_for_read(None) == 'default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_transaction_reads_primary(self, router):
+        assert router.db_for_read(None) == REPLICA
+        with transaction.atomic():
+            assert router.db_for_read(None) == 'default', (
+                'Проверьте, что чтения внутри транзакции идут в основную БД'
+            )
+
+    def test_writes_and_migrations(self, router):
+        assert router.db_for_write(None) == 'default'
+        assert not router.allow_migrate(REPLICA, 'reviews')
+        assert router.allow_migrate('default', 'reviews')
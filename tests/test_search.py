@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def documents(django_user_model):
+    from reviews.models import Comment, Review, Title
+
+    author = django_user_model.objects.create_user(
+        username='reader', email='reader@yamdb.fake')
+    escape = Title.objects.create(
+        name='Побег из Шоушенка', year=1994,
+        description='Тюремная драма о надежде.')
+    godfather = Title.objects.create(
+        name='Крёстный отец', year=1972,
+        description='Семейная сага о мафии и побегах от прошлого.')
+    review = Review.objects.create(
+        title=godfather, author=author, score=9,
+        text='Сцена побега снята великолепно.')
+    Comment.objects.create(
+        review=review, author=author, text='Согласен, тюремный побег!')
+    return {'escape': escape, 'godfather': godfather, 'review': review}
+
+
+@pytest.mark.django_db
+class TestSearch:
+    url = '/api/v1/search/'
+
+    def test_ranked_search(self, documents):
+        response = APIClient().get(self.url, {'q': 'побег'})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [result['type'] for result in results] == [
+            'title', 'title', 'comment', 'review'
+        ], 'Проверьте, что совпадения в названии ранжируются выше описания'
+        assert results[0]['id'] == documents['escape'].id
+        assert results[1]['id'] == documents['godfather'].id
+        assert results[2]['review_id'] == documents['review'].id
+
+    def test_type_filter(self, documents):
+        response = APIClient().get(
+            self.url, {'q': 'побег', 'type': 'review,comment'})
+        assert {result['type'] for result in response.json()['results']} == {
+            'review', 'comment'
+        }
+
+    def test_index_follows_writes(self, documents):
+        client = APIClient()
+        assert client.get(self.url, {'q': 'надежда'}).json()['count'] == 1
+        documents['escape'].delete()
+        documents['review'].text = 'Надежда умирает последней.'
+        documents['review'].save()
+        results = client.get(self.url, {'q': 'надежда'}).json()['results']
+        assert [result['type'] for result in results] == ['review']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_updated_after_commit(self, documents):
+        from django.db import transaction
+
+        client = APIClient()
+        assert client.get(self.url, {'q': 'надежда'}).json()['count'] == 1
+        with transaction.atomic():
+            documents['review'].text = 'Надежда умирает последней.'
+            documents['review'].save()
+            assert client.get(
+                self.url, {'q': 'умирает'}).json()['count'] == 0, (
+                'Проверьте, что индекс обновляется после фиксации'
+            )
+        assert client.get(self.url, {'q': 'умирает'}).json()['count'] == 1
+
+    @pytest.mark.parametrize('params', [{}, {'q': 'x', 'type': 'user'}])
+    def test_bad_request(self, params):
+        assert APIClient().get(self.url, params).status_code == 400
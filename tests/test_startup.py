@@ -0,0 +1,46 @@
+SAMPLE = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django
+import time:        80 |         80 | reviews.rating
+'''
+
+
+class TestImportTime:
+
+    def test_parse(self):
+        from api.importtime import packages, parse
+
+        modules = parse(SAMPLE)
+        assert [module.name for module in modules] == [
+            'django.utils.version', 'django', 'reviews.rating']
+        assert packages(modules) == [('django', 420, 2), ('reviews', 80, 1)]
+
+    def test_setup_skips_rest_framework(self):
+        from api.importtime import TARGETS, run
+
+        elapsed, modules = run(TARGETS['setup'])
+        names = {module.name for module in modules}
+        assert elapsed > 0 and 'django' in names
+        assert 'rest_framework.response' not in names, (
+            'Проверьте, что django.setup() не импортирует DRF'
+        )
+
+    def test_loaddb_imports_progress_lazily(self):
+        from api.importtime import COMMAND_TARGET, run
+
+        _, modules = run(COMMAND_TARGET.format(name='loaddb'))
+        assert 'progress' not in {module.package for module in modules}, (
+            'Проверьте, что loaddb импортирует progress только при загрузке'
+        )
+
+
+class TestWarmUp:
+
+    def test_warm_up(self):
+        from api_yamdb.warmup import warm_up
+        from django.urls import get_resolver
+
+        warm_up()
+        assert get_resolver()._populated, (
+            'Проверьте, что прогрев компилирует маршруты'
+        )
@@ -0,0 +1,86 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'signup_ip': '3/min',
+            'signup_identity': '2/min',
+            'token_ip': '3/min',
+            'token_identity': '2/min',
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    signup_url = '/api/v1/auth/signup/'
+    token_url = '/api/v1/auth/token/'
+
+    def signup(self, username, address='10.0.0.1'):
+        return APIClient(REMOTE_ADDR=address).post(self.signup_url, {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        }, format='json')
+
+    def test_identity_limit(self, rates, django_assert_num_queries):
+        assert self.signup('reader').status_code == 200
+        assert self.signup('reader', '10.0.0.2').status_code == 200
+        with django_assert_num_queries(0):
+            response = self.signup('reader', '10.0.0.3')
+        assert response.status_code == 429, (
+            'Проверьте, что signup ограничен по имени пользователя'
+        )
+        assert 0 < int(response['Retry-After']) <= 30
+
+    def test_ip_limit(self, rates, django_assert_num_queries):
+        for i in range(3):
+            assert self.signup(f'reader{i}').status_code == 200
+        with django_assert_num_queries(0):
+            response = self.signup('reader3')
+        assert response.status_code == 429, (
+            'Проверьте, что signup ограничен по IP-адресу'
+        )
+        assert self.signup('reader3', '10.0.0.2').status_code == 200
+
+    def test_rejected_keeps_other_tokens(self, rates):
+        for _ in range(2):
+            assert self.signup('reader').status_code == 200
+        assert self.signup('reader').status_code == 429
+        assert self.signup('writer').status_code == 200, (
+            'Проверьте, что отклонённый по имени запрос не расходует '
+            'лимит IP-адреса'
+        )
+        assert self.signup('editor').status_code == 429
+
+    def test_token_limit(self, rates, django_user_model):
+        django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake')
+        client = APIClient()
+        data = {'username': 'reader', 'confirmation_code': 'wrong'}
+        statuses = [
+            client.post(self.token_url, data).status_code for _ in range(3)
+        ]
+        assert statuses == [400, 400, 429], (
+            'Проверьте, что подбор кода подтверждения ограничен'
+        )
+        assert APIClient(REMOTE_ADDR='10.0.0.2').post(self.token_url, {
+            'username': 'other', 'confirmation_code': 'wrong'
+        }).status_code == 404
+
+    def test_token_bucket_refill(self, monkeypatch):
+        from api.v1 import throttling
+
+        clock = [100.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: clock[0])
+        buckets = throttling.MemoryBuckets()
+        bucket = [('key', 2, 0.5)]
+        assert [buckets.consume(bucket) for _ in range(3)] == [0, 0, 2.0]
+        clock[0] += 1
+        assert buckets.consume(bucket) == 1.0
+        clock[0] += 1
+        assert buckets.consume(bucket) == 0, (
+            'Проверьте, что корзина пополняется со временем'
+        )